@@ -1,11 +1,86 @@
+import struct
+import sys
+import threading
+from collections.abc import Sequence
 from dataclasses import dataclass, field
+from typing import Callable, Iterator, TypeVar
 from uuid import UUID
 
 from engine_version import EngineVersion
-from file_utils import Buffer
+from file_utils import Buffer, MemoryBuffer
 
+T = TypeVar("T")
 
-@dataclass
+
+class RecordSchema:
+    # Layout of fixed size table record as (field name, struct format) pairs, compiled into single Struct.
+    # Names are serialized as index and number pair, so name fields use "2i" and take two values of the record.
+
+    def __init__(self, *fields: tuple[str, str]):
+        self.fields = fields
+        self.struct = struct.Struct("<" + "".join(fmt for _, fmt in fields))
+        self.size = self.struct.size
+
+    def field_offset(self, name: str) -> int:
+        offset = 0
+        for field_name, fmt in self.fields:
+            if field_name == name:
+                return offset
+            offset += struct.calcsize("<" + fmt)
+        raise KeyError(name)
+
+    def field_struct(self, name: str) -> struct.Struct:
+        # Struct that unpacks only given field from whole record, other bytes are padding
+        fmt = dict(self.fields)[name]
+        offset = self.field_offset(name)
+        return struct.Struct(f"<{offset}x{fmt}{self.size - offset - struct.calcsize('<' + fmt)}x")
+
+    def unpack_from(self, data, offset: int = 0) -> tuple:
+        return self.struct.unpack_from(data, offset)
+
+    def iter_unpack(self, data) -> Iterator[tuple]:
+        # data has to hold whole number of records
+        return self.struct.iter_unpack(data)
+
+
+# UE serializes bools as uint32 that is either 0 or 1, so low byte alone is enough
+BOOL32 = "?3x"
+
+IMPORT_SCHEMA = RecordSchema(
+    ("class_package", "2i"),
+    ("class_name", "2i"),
+    ("outer_index", "i"),
+    ("object_name", "2i"),
+)
+EXPORT_SCHEMA = RecordSchema(
+    ("class_index", "i"),
+    ("super_index", "i"),
+    ("template_index", "i"),
+    ("outer_index", "i"),
+    ("object_name", "2i"),
+    ("save", "I"),
+    ("serial_size", "q"),
+    ("serial_offset", "q"),
+    ("forced_export", "i"),
+    ("not_for_client", "i"),
+    ("not_for_server", "i"),
+    ("package_guid", "16s"),
+    ("package_flags", "I"),
+    ("not_always_loaded_for_editor_game", BOOL32),
+    ("is_asset", BOOL32),
+    ("first_export_dependency", "I"),
+    ("serialization_before_serialization_dependencies", BOOL32),
+    ("create_before_serialization_dependencies", BOOL32),
+    ("serialization_before_create_dependencies", BOOL32),
+    ("create_before_create_dependencies", BOOL32),
+)
+IMPORT_RECORD_SIZE = IMPORT_SCHEMA.size
+EXPORT_RECORD_SIZE = EXPORT_SCHEMA.size
+# Only serial_size of every export record, used to get export_size without decoding exports
+EXPORT_SERIAL_SIZE_STRUCT = EXPORT_SCHEMA.field_struct("serial_size")
+
+
+@dataclass(slots=True)
 class Name:
     value: str
     ihash: int
@@ -13,20 +88,44 @@ class Name:
 
     @classmethod
     def from_buffer(cls, buffer: Buffer):
-        return cls(buffer.read_ue_string(), buffer.read_uint16(), buffer.read_uint16())
+        return cls(sys.intern(buffer.read_ue_string()), buffer.read_uint16(), buffer.read_uint16())
 
     def __str__(self):
         return self.value
 
 
-def read_name(buffer, name_map: list[Name]):
-    name_index = buffer.read_int32()
-    name_number = buffer.read_int32()
-    name = name_map[name_index].value + (f"_{name_number}" if name_number > 0 else "")
-    return name
+class NameMap(Sequence):
+    # Name table of a single package, remembers interned string of every (index, number) pair it resolved
 
+    def __init__(self, names: Sequence[Name]):
+        self._names = names
+        self._resolved: dict[tuple[int, int], str] = {}
 
-@dataclass
+    def __len__(self):
+        return len(self._names)
+
+    def __getitem__(self, index):
+        return self._names[index]
+
+    def __repr__(self):
+        return f"<NameMap {len(self._names)} names>"
+
+    def resolve(self, name_index: int, name_number: int) -> str:
+        key = (name_index, name_number)
+        name = self._resolved.get(key)
+        if name is None:
+            name = self._names[name_index].value
+            if name_number > 0:
+                name = sys.intern(f"{name}_{name_number}")
+            self._resolved[key] = name
+        return name
+
+
+def read_name(buffer, name_map: NameMap):
+    return name_map.resolve(*buffer.read_fmt("2i"))
+
+
+@dataclass(slots=True)
 class UEImportObject:
     class_package: str
     class_name: str
@@ -35,26 +134,54 @@ class UEImportObject:
     outer_package: object
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
-        return cls(read_name(buffer, name_map),
-                   read_name(buffer, name_map),
-                   buffer.read_int32(),
-                   read_name(buffer, name_map),
-                   None)
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
+        return cls.from_record(IMPORT_SCHEMA.unpack_from(buffer.read_view(IMPORT_SCHEMA.size)), name_map)
 
+    @classmethod
+    def from_record(cls, record: tuple, name_map: NameMap):
+        (class_package_index, class_package_number, class_name_index, class_name_number, outer_index,
+         object_name_index, object_name_number) = record
+        resolve = name_map.resolve
+        return cls(resolve(class_package_index, class_package_number), resolve(class_name_index, class_name_number),
+                   outer_index, resolve(object_name_index, object_name_number), None)
 
-@dataclass
+    @classmethod
+    def read_table(cls, data: memoryview, name_map: NameMap) -> list['UEImportObject']:
+        # Decodes whole import table at once and links every import to its outer package
+        imported_objects = [cls.from_record(record, name_map) for record in IMPORT_SCHEMA.iter_unpack(data)]
+        for obj in imported_objects:
+            if obj.outer_index < 0:
+                obj.outer_package = imported_objects[obj.outer_index * -1 - 1]
+        return imported_objects
+
+
+@dataclass(slots=True, frozen=True)
 class UEPackageIndex:
     index: int
     obj_import: UEImportObject | None
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, import_list: list[UEImportObject]):
-        index = buffer.read_int32()
+    def from_index(cls, index: int, import_list: Sequence[UEImportObject]):
         return cls(index, import_list[index * -1 - 1] if index < 0 else None)
 
 
-@dataclass
+class PackageIndexCache(dict[int, UEPackageIndex]):
+    def __init__(self, import_list: Sequence[UEImportObject]):
+        super().__init__()
+        self.import_list = import_list
+
+    def __missing__(self, index: int) -> UEPackageIndex:
+        package_index = self[index] = UEPackageIndex.from_index(index, self.import_list)
+        return package_index
+
+
+class GuidCache(dict[bytes, UUID]):
+    def __missing__(self, guid_bytes: bytes) -> UUID:
+        guid = self[guid_bytes] = UUID(bytes=guid_bytes)
+        return guid
+
+
+@dataclass(slots=True)
 class UEObjectExport:
     class_index: UEPackageIndex
     super_index: UEPackageIndex
@@ -78,29 +205,97 @@ class UEObjectExport:
     create_before_create_dependencies: bool
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name], import_list: list[UEImportObject]):
-        return cls(
-            UEPackageIndex.from_buffer(buffer, import_list),
-            UEPackageIndex.from_buffer(buffer, import_list),
-            UEPackageIndex.from_buffer(buffer, import_list),
-            UEPackageIndex.from_buffer(buffer, import_list),
-            read_name(buffer, name_map),
-            buffer.read_uint32(),
-            buffer.read_int64(),
-            buffer.read_int64(),
-            buffer.read_int32(),
-            buffer.read_int32(),
-            buffer.read_int32(),
-            UUID(bytes=buffer.read(16)),
-            buffer.read_uint32(),
-            buffer.read_uint32() != 0,
-            buffer.read_uint32() != 0,
-            buffer.read_uint32(),
-            buffer.read_uint32() != 0,
-            buffer.read_uint32() != 0,
-            buffer.read_uint32() != 0,
-            buffer.read_uint32() != 0,
-        )
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap, import_list: list[UEImportObject]):
+        record = EXPORT_SCHEMA.unpack_from(buffer.read_view(EXPORT_SCHEMA.size))
+        return cls.from_record(record, name_map, PackageIndexCache(import_list), GuidCache())
+
+    @classmethod
+    def from_record(cls, record: tuple, name_map: NameMap, package_indices: 'PackageIndexCache',
+                    guids: 'GuidCache'):
+        (class_index, super_index, template_index, outer_index, name_index, name_number, save, serial_size,
+         serial_offset, forced_export, not_for_client, not_for_server, package_guid, package_flags,
+         not_always_loaded_for_editor_game, is_asset, first_export_dependency,
+         serialization_before_serialization_dependencies, create_before_serialization_dependencies,
+         serialization_before_create_dependencies, create_before_create_dependencies) = record
+        return cls(package_indices[class_index], package_indices[super_index], package_indices[template_index],
+                   package_indices[outer_index], name_map.resolve(name_index, name_number), save, serial_size,
+                   serial_offset, forced_export, not_for_client, not_for_server, guids[package_guid],
+                   package_flags, not_always_loaded_for_editor_game, is_asset, first_export_dependency,
+                   serialization_before_serialization_dependencies,
+                   create_before_serialization_dependencies, serialization_before_create_dependencies,
+                   create_before_create_dependencies)
+
+    @classmethod
+    def read_table(cls, data: memoryview, name_map: NameMap,
+                   import_list: Sequence[UEImportObject]) -> list['UEObjectExport']:
+        # Decodes whole export table at once, package indices and guids repeat a lot between exports,
+        # so every distinct value is decoded once and shared by all exports referencing it, both are immutable
+        package_indices = PackageIndexCache(import_list)
+        guids = GuidCache()
+        return [cls.from_record(record, name_map, package_indices, guids) for record in EXPORT_SCHEMA.iter_unpack(data)]
+
+
+def get_export_type(exported: UEObjectExport) -> str:
+    if exported.class_index.index < 0:
+        return exported.class_index.obj_import.object_name
+    return exported.object_name
+
+
+class LazyTable(Sequence):
+    # Read-only table of fixed size records, every record is decoded from header on first access
+
+    def __init__(self, buffer: MemoryBuffer, offset: int, count: int, record_size: int,
+                 decode: Callable[[Buffer], T]):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+        self._record_size = record_size
+        self._decode = decode
+        self._entries: list[T | None] = [None] * count
+
+    def __len__(self):
+        return self._count
+
+    def _entry_offset(self, index: int) -> int:
+        return self._offset + index * self._record_size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"Index {index} is out of range, table has {self._count} entries")
+        entry = self._entries[index]
+        if entry is None:
+            # Racing threads may both decode the same record, the results are equal so either can win
+            entry = self._decode(self._buffer.slice(self._entry_offset(index)))
+            self._entries[index] = entry
+        return entry
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._count} entries>"
+
+
+class LazyNameMap(LazyTable):
+    # Names have variable size, offsets are found by skipping over strings up to the highest requested index
+
+    def __init__(self, buffer: MemoryBuffer, offset: int, count: int):
+        super().__init__(buffer, offset, count, 0, Name.from_buffer)
+        self._offsets = [offset]
+        self._lock = threading.Lock()
+
+    def _entry_offset(self, index: int) -> int:
+        if index >= len(self._offsets):
+            data = self._buffer.data
+            with self._lock:
+                offset = self._offsets[-1]
+                while len(self._offsets) <= index:
+                    (size,) = struct.unpack_from("<i", data, offset)
+                    # String length (negative for UTF-16 strings), characters, then two uint16 hashes
+                    offset += 4 + (size if size >= 0 else -size * 2) + 4
+                    self._offsets.append(offset)
+        return self._offsets[index]
 
 
 @dataclass
@@ -114,10 +309,12 @@ class UEAsset:
     exported_objects: list[UEObjectExport] = field(repr=False)
     export_size: int
     total_header_size: int
-    name_map: list[Name] = field(repr=False)
+    name_map: NameMap = field(repr=False)
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer):
+    def from_buffer(cls, buffer: Buffer, lazy: bool = False):
+        # Lazy mode only parses package summary, name, import and export tables decode entries on first access.
+        # Tables keep view of the header, so buffer can be closed afterwards.
         assert buffer.read_uint32() == 0x9E2A83C1
         legacy_version = buffer.read_int32()
         assert legacy_version == -7
@@ -147,23 +344,37 @@ class UEAsset:
         additional_packages_to_cook = [buffer.read_ue_string() for _ in range(buffer.read_uint32())]
         build_data_start_offset = buffer.read_uint32()
         wold_tile_info_data_offset = buffer.read_uint32()
-        chunk_ids = [buffer.read_int32() for _ in range(buffer.read_uint32())]
+        chunk_ids = buffer.read_int32_array(buffer.read_uint32())
         preload_dependency_count = buffer.read_uint32()
         preload_dependency_offset = buffer.read_uint32()
+        if lazy:
+            with buffer.read_from_offset(0):
+                header = MemoryBuffer(buffer.read_view(total_header_size))
+            name_map = NameMap(LazyNameMap(header, name_offset, name_count))
+            imported_objects = LazyTable(header, import_offset, import_count, IMPORT_RECORD_SIZE,
+                                         lambda import_buffer: cls._read_import(import_buffer, name_map,
+                                                                                imported_objects))
+            exported_objects = LazyTable(header, export_offset, export_count, EXPORT_RECORD_SIZE,
+                                         lambda export_buffer: UEObjectExport.from_buffer(export_buffer, name_map,
+                                                                                          imported_objects))
+            export_table = header.data[export_offset:export_offset + export_count * EXPORT_RECORD_SIZE]
+            export_size = sum(serial_size for (serial_size,) in EXPORT_SERIAL_SIZE_STRUCT.iter_unpack(export_table))
+            return cls(legacy_version, file_version, file_licensee_version, folder_name, package_flags,
+                       imported_objects, exported_objects, export_size, total_header_size, name_map)
         with buffer.read_from_offset(name_offset):
-            name_map: list[Name] = [Name.from_buffer(buffer) for _ in range(name_count)]
-        imported_objects = []
+            name_map = NameMap([Name.from_buffer(buffer) for _ in range(name_count)])
         with buffer.read_from_offset(import_offset):
-            for _ in range(import_count):
-                imported_objects.append(UEImportObject.from_buffer(buffer, name_map))
-        for obj in imported_objects:
-            if obj.outer_index < 0:
-                obj.outer_package = imported_objects[obj.outer_index * -1 - 1]
-
-        exported_objects = []
+            imported_objects = UEImportObject.read_table(buffer.read_view(import_count * IMPORT_RECORD_SIZE), name_map)
         with buffer.read_from_offset(export_offset):
-            for _ in range(export_count):
-                exported_objects.append(UEObjectExport.from_buffer(buffer, name_map, imported_objects))
+            exported_objects = UEObjectExport.read_table(buffer.read_view(export_count * EXPORT_RECORD_SIZE),
+                                                         name_map, imported_objects)
         export_size = sum(exported_object.serial_size for exported_object in exported_objects)
         return cls(legacy_version, file_version, file_licensee_version, folder_name, package_flags,
                    imported_objects, exported_objects, export_size, total_header_size, name_map)
+
+    @staticmethod
+    def _read_import(buffer: Buffer, name_map: NameMap, imported_objects: Sequence[UEImportObject]):
+        obj = UEImportObject.from_buffer(buffer, name_map)
+        if obj.outer_index < 0:
+            obj.outer_package = imported_objects[obj.outer_index * -1 - 1]
+        return obj
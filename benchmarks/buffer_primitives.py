@@ -0,0 +1,43 @@
+import struct
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_utils import MemoryBuffer  # noqa: E402
+
+FIELD_COUNT = 100_000
+
+
+# Reproduces MemoryBuffer._read before struct caching, used as the baseline
+class UncachedMemoryBuffer(MemoryBuffer):
+    def _read(self, fmt: str):
+        data = struct.unpack_from(self._endian + fmt, self._buffer, self._offset)
+        self._offset += struct.calcsize(self._endian + fmt)
+        return data[0]
+
+    def read_fmt(self, fmt):
+        data = struct.unpack_from(self._endian + fmt, self._buffer, self._offset)
+        self._offset += struct.calcsize(self._endian + fmt)
+        return data
+
+
+def read_fields(buffer: MemoryBuffer):
+    buffer.seek(0)
+    for _ in range(FIELD_COUNT // 4):
+        buffer.read_uint32()
+        buffer.read_int32()
+        buffer.read_fmt("2I")
+
+
+def main():
+    payload = bytes(FIELD_COUNT * 4)
+    for name, buffer_class in (("before (uncached)", UncachedMemoryBuffer), ("after (cached)", MemoryBuffer)):
+        buffer = buffer_class(payload)
+        best = min(timeit.repeat(lambda: read_fields(buffer), number=5, repeat=5)) / 5
+        print(f"{name:>18}: {best * 1e9 / FIELD_COUNT:7.1f} ns/field")
+
+
+if __name__ == '__main__':
+    main()
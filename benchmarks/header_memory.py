@@ -0,0 +1,103 @@
+import dataclasses
+import gc
+import struct
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import asset  # noqa: E402
+from file_utils import MemoryBuffer  # noqa: E402
+
+EXPORT_COUNT = 50_000
+IMPORT_COUNT = 2_000
+SLOTTED_CLASSES = ("Name", "UEImportObject", "UEPackageIndex", "UEObjectExport")
+
+
+def fstring(value: str) -> bytes:
+    encoded = value.encode("ascii") + b"\x00"
+    return struct.pack("<i", len(encoded)) + encoded
+
+
+def build_package(export_count: int, import_count: int) -> bytes:
+    # Header of a package with export_count exports, each with its own name, classes spread over imports
+    names = ["None", "/Script/Engine", "Class", "Package"]
+    names += [f"Class{i}" for i in range(import_count)]
+    names += [f"Export{i}" for i in range(export_count)]
+
+    summary = bytearray()
+    summary += struct.pack("<Ii3II", 0x9E2A83C1, -7, 864, 522, 0, 0)
+    summary += struct.pack("<I", 0)  # total_header_size, patched below
+    summary += fstring("None")
+    summary += struct.pack("<I", 0)
+    tables_at = len(summary)
+    summary += bytes(8 * 4 + 4 + 8 + 8)
+    summary += bytes(16)
+    summary += struct.pack("<I", 0)
+    for _ in range(2):
+        summary += struct.pack("<3HI", 4, 26, 0, 0) + fstring("++UE4+Release-4.26")
+    summary += struct.pack("<2I", 0, 0)
+    summary += struct.pack("<I", 0)
+    summary += struct.pack("<I", 0)
+    summary += struct.pack("<3I", 0, 0, 0)
+    summary += struct.pack("<2I", 0, 0)
+
+    name_table = b"".join(fstring(name) + struct.pack("<2H", 0, 0) for name in names)
+    import_record = struct.Struct("<2i2ii2i")
+    # First import is the package every class import lives in
+    import_table = import_record.pack(1, 0, 3, 0, 0, 1, 0)
+    import_table += b"".join(import_record.pack(1, 0, 2, 0, -1, 4 + i, 0) for i in range(1, import_count))
+    export_record = struct.Struct("<4i2iIqq3i16sI2II4I")
+    name_offset = len(summary)
+    import_offset = name_offset + len(name_table)
+    export_offset = import_offset + len(import_table)
+    total_header_size = export_offset + export_count * export_record.size
+    export_table = b"".join(
+        export_record.pack(-2 - i % (import_count - 1), 0, 0, 0, 4 + import_count + i, 0, 0, 64,
+                           total_header_size + i * 64, 0, 0, 0, bytes(16), 0, 0, 1, 0, 0, 0, 0, 0)
+        for i in range(export_count))
+
+    struct.pack_into("<I", summary, 24, total_header_size)
+    struct.pack_into("<8I", summary, tables_at, len(names), name_offset, 0, 0, export_count, export_offset,
+                     import_count, import_offset)
+    return bytes(summary) + name_table + import_table + export_table
+
+
+def unslotted(cls):
+    # Same dataclass without slots, reproduces header records before they were slotted
+    namespace = {"__annotations__": cls.__annotations__, "__module__": cls.__module__}
+    namespace.update({key: value for key, value in vars(cls).items()
+                      if key in ("from_buffer", "from_record", "from_index", "read_table", "__str__")})
+    return dataclasses.dataclass(type(cls.__name__, (), namespace))
+
+
+def measure(package: bytes, lazy: bool = False) -> int:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    parsed = asset.UEAsset.from_buffer(MemoryBuffer(package), lazy)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del parsed
+    return used
+
+
+def main():
+    package = build_package(EXPORT_COUNT, IMPORT_COUNT)
+    slotted = {name: getattr(asset, name) for name in SLOTTED_CLASSES}
+    unslotted_classes = {name: unslotted(cls) for name, cls in slotted.items()}
+    for label, classes in (("before (dict)", unslotted_classes), ("after (slots)", slotted)):
+        for name, cls in classes.items():
+            setattr(asset, name, cls)
+        used = measure(package)
+        print(f"{label:>14}: {used / EXPORT_COUNT:7.1f} bytes/export, {used / (1024 * 1024):6.1f} MiB total")
+    for name, cls in slotted.items():
+        setattr(asset, name, cls)
+    # Lazy tables keep only a view of the header until entries are accessed
+    used = measure(package, lazy=True)
+    print(f"{'lazy (slots)':>14}: {used / EXPORT_COUNT:7.1f} bytes/export, {used / (1024 * 1024):6.1f} MiB total")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import sys
+import time
+from pathlib import Path
+from uuid import UUID
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from asset import EXPORT_RECORD_SIZE, UEAsset, UEObjectExport, UEPackageIndex, read_name  # noqa: E402
+from file_utils import MemoryBuffer  # noqa: E402
+from header_memory import build_package  # noqa: E402
+
+EXPORT_COUNTS = (1_000, 10_000, 50_000)
+IMPORT_COUNT = 500
+RUNS = 5
+
+
+def read_export_per_field(buffer, name_map, import_list):
+    # Export record decoded field by field, reproduces export table parsing before record schemas
+    return UEObjectExport(
+        UEPackageIndex.from_index(buffer.read_int32(), import_list),
+        UEPackageIndex.from_index(buffer.read_int32(), import_list),
+        UEPackageIndex.from_index(buffer.read_int32(), import_list),
+        UEPackageIndex.from_index(buffer.read_int32(), import_list),
+        read_name(buffer, name_map),
+        buffer.read_uint32(),
+        buffer.read_int64(),
+        buffer.read_int64(),
+        buffer.read_int32(),
+        buffer.read_int32(),
+        buffer.read_int32(),
+        UUID(bytes=buffer.read(16)),
+        buffer.read_uint32(),
+        buffer.read_uint32() != 0,
+        buffer.read_uint32() != 0,
+        buffer.read_uint32(),
+        buffer.read_uint32() != 0,
+        buffer.read_uint32() != 0,
+        buffer.read_uint32() != 0,
+        buffer.read_uint32() != 0,
+    )
+
+
+def best_time(function) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    for export_count in EXPORT_COUNTS:
+        package = build_package(export_count, IMPORT_COUNT)
+        parsed = UEAsset.from_buffer(MemoryBuffer(package))
+        export_offset = parsed.total_header_size - export_count * EXPORT_RECORD_SIZE
+        buffer = MemoryBuffer(package)
+
+        def per_field():
+            buffer.seek(export_offset)
+            return [read_export_per_field(buffer, parsed.name_map, parsed.imported_objects)
+                    for _ in range(export_count)]
+
+        def schema():
+            export_table = buffer.data[export_offset:parsed.total_header_size]
+            return UEObjectExport.read_table(export_table, parsed.name_map, parsed.imported_objects)
+
+        assert per_field() == schema()
+        before = best_time(per_field)
+        after = best_time(schema)
+        print(f"{export_count:>6} exports: per field {before * 1000:7.1f} ms, schema {after * 1000:6.1f} ms, "
+              f"{before / after:4.1f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from header_memory import build_package  # noqa: E402
+
+PROJECT_MODULES = {path.stem for path in ROOT.glob("*.py")}
+HEAVY_MODULES = ("numpy", "PIL", "sqlite3")
+RUNS = 5
+
+
+def import_profile(args: list[str]) -> tuple[float, list[str]]:
+    # Total import time in ms and modules loaded, from `python -X importtime` output
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True,
+                               text=True, check=True)
+    total_us = 0
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        total_us += int(self_us)
+        modules.append(name.strip())
+    return total_us / 1000, modules
+
+
+def wall_time(args: list[str]) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        package_path = Path(temp_dir) / "Package.uasset"
+        package_path.write_bytes(build_package(100, 10))
+        commands = {
+            "python -c pass": ["-c", "pass"],
+            "utexturedecoder ls": ["-m", "utexturedecoder", "ls", os.fspath(package_path)],
+            "utexturedecoder probe": ["-m", "utexturedecoder", "probe", os.fspath(package_path)],
+            "import texture_2d": ["-c", "import texture_2d"],
+            "import extractor": ["-c", "import extractor"],
+        }
+        for label, args in commands.items():
+            import_ms, modules = import_profile(args)
+            project = sorted(PROJECT_MODULES.intersection(modules))
+            heavy = [name for name in HEAVY_MODULES if name in modules]
+            print(f"{label:>22}: {wall_time(args):6.1f} ms wall, {import_ms:6.1f} ms imports, "
+                  f"modules: {', '.join(project) or '-'}; heavy: {', '.join(heavy) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import contextlib
+import fnmatch
+import sqlite3
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from asset import UEAsset, get_export_type
+from file_utils import MappedFileBuffer
+from package_files import package_fingerprint
+from probe import probe_texture_export
+
+CATALOG_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS packages (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    file_version INTEGER,
+    file_licensee_version INTEGER,
+    folder_name TEXT,
+    package_flags INTEGER,
+    name_count INTEGER,
+    import_count INTEGER,
+    export_count INTEGER,
+    total_header_size INTEGER,
+    export_size INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS exports (
+    package_id INTEGER NOT NULL REFERENCES packages(id) ON DELETE CASCADE,
+    export_index INTEGER NOT NULL,
+    object_name TEXT NOT NULL,
+    class_name TEXT NOT NULL,
+    serial_size INTEGER NOT NULL,
+    serial_offset INTEGER NOT NULL,
+    PRIMARY KEY (package_id, export_index)
+);
+CREATE TABLE IF NOT EXISTS textures (
+    package_id INTEGER NOT NULL REFERENCES packages(id) ON DELETE CASCADE,
+    export_index INTEGER NOT NULL,
+    texture_index INTEGER NOT NULL,
+    size_x INTEGER NOT NULL,
+    size_y INTEGER NOT NULL,
+    pixel_format TEXT NOT NULL,
+    mip_count INTEGER NOT NULL,
+    slice_count INTEGER NOT NULL,
+    cubemap INTEGER NOT NULL,
+    is_virtual INTEGER NOT NULL,
+    bulk_size INTEGER NOT NULL,
+    inline_size INTEGER NOT NULL,
+    layer_pixel_formats TEXT NOT NULL,
+    PRIMARY KEY (package_id, export_index, texture_index)
+);
+CREATE INDEX IF NOT EXISTS exports_class ON exports (class_name);
+CREATE INDEX IF NOT EXISTS textures_format ON textures (pixel_format);
+"""
+
+
+@dataclass
+class PackageRecord:
+    path: str
+    fingerprint: str
+    summary: tuple = ()
+    exports: list[tuple] = field(default_factory=list)
+    textures: list[tuple] = field(default_factory=list)
+    error: str | None = None
+
+
+@dataclass
+class TextureRecord:
+    path: str
+    export_name: str
+    texture_index: int
+    size_x: int
+    size_y: int
+    pixel_format: str
+    mip_count: int
+    slice_count: int
+    cubemap: bool
+    is_virtual: bool
+    bulk_size: int
+    inline_size: int
+    # Pixel formats of virtual texture layers, empty for regular textures
+    layer_pixel_formats: list[str]
+
+
+def scan_package(asset_path: Path, root: Path) -> PackageRecord:
+    record = PackageRecord(asset_path.relative_to(root).as_posix(), package_fingerprint(asset_path))
+    try:
+        with MappedFileBuffer(asset_path) as asset_file:
+            asset = UEAsset.from_buffer(asset_file, lazy=True)
+        record.summary = (asset.file_version, asset.file_licensee_version, asset.folder_name, asset.package_flags,
+                          len(asset.name_map), len(asset.imported_objects), len(asset.exported_objects),
+                          asset.total_header_size, asset.export_size)
+        uexp_path = asset_path.with_suffix(".uexp")
+        with contextlib.ExitStack() as stack:
+            uexp_file = None
+            for export_index, exported in enumerate(asset.exported_objects):
+                class_name = get_export_type(exported)
+                record.exports.append((export_index, exported.object_name, class_name, exported.serial_size,
+                                       exported.serial_offset))
+                if class_name != "Texture2D":
+                    continue
+                if uexp_file is None:
+                    uexp_file = stack.enter_context(MappedFileBuffer(uexp_path))
+                uexp_file.seek(exported.serial_offset - asset.total_header_size)
+                for texture in probe_texture_export(uexp_file, asset.name_map, exported.object_name):
+                    record.textures.append((export_index, texture.texture_index, texture.size_x, texture.size_y,
+                                            texture.pixel_format, texture.mip_count, texture.slice_count,
+                                            texture.cubemap, texture.is_virtual, texture.bulk_size,
+                                            texture.inline_size, ",".join(texture.layer_pixel_formats)))
+    except Exception:
+        record.exports.clear()
+        record.textures.clear()
+        record.error = traceback.format_exc()
+    return record
+
+
+class Catalog:
+    # SQLite index of packages under single root, paths are stored relative to it
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        version = self.get_meta("version")
+        if version is not None and int(version) != CATALOG_VERSION:
+            raise ValueError(f"Catalog {path} has version {version}, expected {CATALOG_VERSION}")
+        self.set_meta("version", str(CATALOG_VERSION))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_meta(self, key: str, value: str):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def fingerprints(self) -> dict[str, str]:
+        return dict(self.connection.execute("SELECT path, fingerprint FROM packages"))
+
+    def pending_packages(self, root: Path, asset_paths: Iterable[Path]) -> tuple[list[Path], int]:
+        # Packages that are new or changed since last indexing, and number of unchanged ones
+        known = self.fingerprints()
+        pending = []
+        unchanged = 0
+        for asset_path in asset_paths:
+            if known.get(asset_path.relative_to(root).as_posix()) == package_fingerprint(asset_path):
+                unchanged += 1
+            else:
+                pending.append(asset_path)
+        return pending, unchanged
+
+    def store(self, record: PackageRecord):
+        # Replaces everything recorded for the package, changes become visible after commit()
+        self.connection.execute("DELETE FROM packages WHERE path = ?", (record.path,))
+        summary = record.summary or (None,) * 9
+        cursor = self.connection.execute(
+            "INSERT INTO packages (path, fingerprint, file_version, file_licensee_version, folder_name, "
+            "package_flags, name_count, import_count, export_count, total_header_size, export_size, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (record.path, record.fingerprint, *summary, record.error))
+        package_id = cursor.lastrowid
+        self.connection.executemany("INSERT INTO exports VALUES (?, ?, ?, ?, ?, ?)",
+                                    [(package_id, *export) for export in record.exports])
+        self.connection.executemany("INSERT INTO textures VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    [(package_id, *texture) for texture in record.textures])
+
+    def commit(self):
+        self.connection.commit()
+
+    def prune(self, seen_paths: Iterable[str], include: Iterable[str] = (),
+              exclude: Iterable[str] = ()) -> int:
+        # Removes packages within include/exclude filter that weren't found in the tree anymore
+        include = list(include)
+        exclude = list(exclude)
+        seen_paths = set(seen_paths)
+        removed = []
+        for (path,) in self.connection.execute("SELECT path FROM packages"):
+            if path in seen_paths:
+                continue
+            if include and not any(fnmatch.fnmatch(path, pattern) for pattern in include):
+                continue
+            if any(fnmatch.fnmatch(path, pattern) for pattern in exclude):
+                continue
+            removed.append((path,))
+        with self.connection:
+            self.connection.executemany("DELETE FROM packages WHERE path = ?", removed)
+        return len(removed)
+
+    def find_textures(self, pixel_format: str | None = None, min_size: int | None = None,
+                      max_size: int | None = None, is_virtual: bool | None = None,
+                      path_glob: str | None = None) -> list[TextureRecord]:
+        # min_size and max_size apply to the larger side of the top mip
+        conditions = []
+        params: list = []
+        if pixel_format is not None:
+            conditions.append("t.pixel_format = ?")
+            params.append(pixel_format)
+        if min_size is not None:
+            conditions.append("max(t.size_x, t.size_y) >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            conditions.append("max(t.size_x, t.size_y) <= ?")
+            params.append(max_size)
+        if is_virtual is not None:
+            conditions.append("t.is_virtual = ?")
+            params.append(int(is_virtual))
+        if path_glob is not None:
+            conditions.append("p.path GLOB ?")
+            params.append(path_glob)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(
+            "SELECT p.path, e.object_name, t.texture_index, t.size_x, t.size_y, t.pixel_format, t.mip_count, "
+            "t.slice_count, t.cubemap, t.is_virtual, t.bulk_size, t.inline_size, t.layer_pixel_formats "
+            "FROM textures t JOIN packages p ON p.id = t.package_id "
+            "JOIN exports e ON e.package_id = t.package_id AND e.export_index = t.export_index "
+            f"{where} ORDER BY p.path, t.export_index, t.texture_index", params)
+        return [TextureRecord(path, export_name, texture_index, size_x, size_y, pixel_format, mip_count,
+                              slice_count, bool(cubemap), bool(is_virtual), bulk_size, inline_size,
+                              layer_pixel_formats.split(",") if layer_pixel_formats else [])
+                for (path, export_name, texture_index, size_x, size_y, pixel_format, mip_count, slice_count,
+                     cubemap, is_virtual, bulk_size, inline_size, layer_pixel_formats) in rows]
+
+    def count_exports_by_class(self) -> dict[str, int]:
+        return dict(self.connection.execute(
+            "SELECT class_name, count(*) FROM exports GROUP BY class_name ORDER BY count(*) DESC"))
+
+    def failed_packages(self) -> list[tuple[str, str]]:
+        return list(self.connection.execute("SELECT path, error FROM packages WHERE error IS NOT NULL"))
+
+    def execute(self, sql: str, params: Iterable = ()) -> Iterator[tuple]:
+        return self.connection.execute(sql, tuple(params))
@@ -0,0 +1,101 @@
+import struct
+from dataclasses import dataclass
+from typing import BinaryIO
+
+DDS_MAGIC = b"DDS "
+
+DDSD_CAPS = 0x1
+DDSD_HEIGHT = 0x2
+DDSD_WIDTH = 0x4
+DDSD_PITCH = 0x8
+DDSD_PIXELFORMAT = 0x1000
+DDSD_MIPMAPCOUNT = 0x20000
+DDSD_LINEARSIZE = 0x80000
+
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+DDPF_LUMINANCE = 0x20000
+
+DDSCAPS_COMPLEX = 0x8
+DDSCAPS_TEXTURE = 0x1000
+DDSCAPS_MIPMAP = 0x400000
+DDSCAPS2_CUBEMAP_ALLFACES = 0x200 | 0xFC00
+
+DDS_DIMENSION_TEXTURE2D = 3
+DDS_RESOURCE_MISC_TEXTURECUBE = 0x4
+
+
+@dataclass(frozen=True)
+class DDSFormat:
+    block_size: int
+    block_bytes: int
+    dxgi_format: int
+    # Legacy DDS_PIXELFORMAT (flags, fourcc, bit count, r, g, b, a masks), None when only DX10 header can describe it
+    legacy: tuple[int, bytes, int, int, int, int, int] | None
+
+    @property
+    def compressed(self) -> bool:
+        return self.block_size > 1
+
+
+DDS_FORMATS: dict[str, DDSFormat] = {
+    "PF_DXT1": DDSFormat(4, 8, 71, (DDPF_FOURCC, b"DXT1", 0, 0, 0, 0, 0)),
+    "PF_DXT3": DDSFormat(4, 16, 74, (DDPF_FOURCC, b"DXT3", 0, 0, 0, 0, 0)),
+    "PF_DXT5": DDSFormat(4, 16, 77, (DDPF_FOURCC, b"DXT5", 0, 0, 0, 0, 0)),
+    "PF_BC4": DDSFormat(4, 8, 80, None),
+    "PF_BC5": DDSFormat(4, 16, 83, None),
+    "PF_BC6H": DDSFormat(4, 16, 95, None),
+    "PF_BC7": DDSFormat(4, 16, 98, None),
+    "PF_G8": DDSFormat(1, 1, 61, (DDPF_LUMINANCE, b"\x00" * 4, 8, 0xFF, 0, 0, 0)),
+    "PF_B8G8R8A8": DDSFormat(1, 4, 87, (DDPF_RGB | DDPF_ALPHAPIXELS, b"\x00" * 4, 32,
+                                        0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)),
+}
+
+
+def get_dds_format(pixel_format: str) -> DDSFormat:
+    dds_format = DDS_FORMATS.get(pixel_format)
+    if dds_format is None:
+        raise NotImplementedError(f"{pixel_format} can't be written to DDS")
+    return dds_format
+
+
+def dds_surface_size(dds_format: DDSFormat, width: int, height: int) -> int:
+    blocks_x = -(-width // dds_format.block_size)
+    blocks_y = -(-height // dds_format.block_size)
+    return blocks_x * blocks_y * dds_format.block_bytes
+
+
+def write_dds_header(file: BinaryIO, pixel_format: str, width: int, height: int, mip_count: int = 1,
+                     layer_count: int = 1, cubemap: bool = False):
+    dds_format = get_dds_format(pixel_format)
+    flags = DDSD_CAPS | DDSD_HEIGHT | DDSD_WIDTH | DDSD_PIXELFORMAT | DDSD_MIPMAPCOUNT
+    if dds_format.compressed:
+        flags |= DDSD_LINEARSIZE
+        pitch_or_linear_size = dds_surface_size(dds_format, width, height)
+    else:
+        flags |= DDSD_PITCH
+        pitch_or_linear_size = width * dds_format.block_bytes
+    caps = DDSCAPS_TEXTURE
+    if mip_count > 1:
+        caps |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
+    caps2 = 0
+    if cubemap:
+        caps |= DDSCAPS_COMPLEX
+        caps2 |= DDSCAPS2_CUBEMAP_ALLFACES
+
+    # Texture arrays and formats without FourCC need DX10 extension header
+    array_size = layer_count // 6 if cubemap else layer_count
+    use_dx10 = dds_format.legacy is None or array_size > 1
+    if use_dx10:
+        pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask = DDPF_FOURCC, b"DX10", 0, 0, 0, 0, 0
+    else:
+        pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask = dds_format.legacy
+
+    file.write(DDS_MAGIC)
+    file.write(struct.pack("<7I44x", 124, flags, height, width, pitch_or_linear_size, 0, mip_count))
+    file.write(struct.pack("<2I4s5I", 32, pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, a_mask))
+    file.write(struct.pack("<4I4x", caps, caps2, 0, 0))
+    if use_dx10:
+        file.write(struct.pack("<5I", dds_format.dxgi_format, DDS_DIMENSION_TEXTURE2D,
+                               DDS_RESOURCE_MISC_TEXTURECUBE if cubemap else 0, array_size, 0))
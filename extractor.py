@@ -0,0 +1,102 @@
+import contextlib
+import errno
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from asset import UEAsset, get_export_type
+from file_utils import MappedFileBuffer
+from package_files import package_size
+from streaming import stream_virtual_texture
+from texture_2d import Texture2D
+
+STREAM_SUFFIXES = {"tiff": ".tif", "raw": ".raw", "tiles": ""}
+OUTPUT_FORMATS = ("png", "dds")
+
+
+@dataclass
+class ExtractionOptions:
+    src_root: Path
+    dst_root: Path
+    tile_threads: int = 1
+    stream_format: str | None = None
+    band_rows: int = 1
+    max_size: int | None = None
+    output_format: str = "png"
+
+
+@dataclass
+class ExtractionResult:
+    asset_path: Path
+    export_outputs: dict[str, list[Path]] = field(default_factory=dict)
+    bytes_read: int = 0
+    pixels: int = 0
+    error: str | None = None
+
+    @property
+    def outputs(self) -> list[Path]:
+        return [output for outputs in self.export_outputs.values() for output in outputs]
+
+
+def extract_asset(asset_path: Path, options: ExtractionOptions) -> ExtractionResult:
+    result = ExtractionResult(asset_path, bytes_read=package_size(asset_path))
+    output_dir = options.dst_root / asset_path.parent.relative_to(options.src_root)
+
+    with MappedFileBuffer(asset_path) as asset_file:
+        asset = UEAsset.from_buffer(asset_file, lazy=True)
+
+    uexp_path = asset_path.with_suffix(".uexp")
+    ubulk_path = asset_path.with_suffix(".ubulk")
+    with contextlib.ExitStack() as stack:
+        uexp_file = stack.enter_context(MappedFileBuffer(uexp_path))
+        ubulk_file = stack.enter_context(MappedFileBuffer(ubulk_path)) if ubulk_path.exists() else None
+        asset_size = asset.total_header_size
+        try:
+            for exported in asset.exported_objects:
+                if get_export_type(exported) != "Texture2D":
+                    continue
+                uexp_file.seek(exported.serial_offset - asset_size)
+                # Properties aren't needed for extraction, they are skipped without decoding
+                obj = Texture2D.from_buffer(uexp_file, asset.name_map, asset.imported_objects, asset.export_size, ())
+                outputs = result.export_outputs.setdefault(exported.object_name, [])
+                for tex_id, texture in enumerate(obj.textures):
+                    if tex_id == 0 and len(obj.textures) == 1:
+                        output_name = exported.object_name
+                    else:
+                        output_name = exported.object_name + f"_{tex_id}"
+                    output_dir.mkdir(parents=True, exist_ok=True)
+                    mip = texture.select_mip(max_size=options.max_size)
+                    if options.output_format == "dds" and texture.supports_dds_passthrough():
+                        output_texture_path = (output_dir / output_name).with_suffix(".dds")
+                        with output_texture_path.open("wb") as output_file:
+                            texture.to_dds(ubulk_file, output_file, mip)
+                        outputs.append(output_texture_path)
+                        mip_size_x, mip_size_y = texture.mip_size(mip)
+                        result.pixels += mip_size_x * mip_size_y
+                        continue
+                    if texture.is_virtual and options.stream_format is not None:
+                        output_path = output_dir / (output_name + STREAM_SUFFIXES[options.stream_format])
+                        outputs.extend(stream_virtual_texture(texture, ubulk_file, output_path,
+                                                              options.stream_format, options.band_rows,
+                                                              options.tile_threads, mip))
+                        mip_size_x, mip_size_y = texture.mip_size(mip)
+                        result.pixels += mip_size_x * mip_size_y
+                        continue
+                    texture_data = texture.get_data(ubulk_file, options.tile_threads, mip)
+                    output_texture_path = (output_dir / output_name).with_suffix(".png")
+                    texture_data.save(output_texture_path)
+                    outputs.append(output_texture_path)
+                    result.pixels += texture_data.width * texture_data.height
+        except FileNotFoundError as ex:
+            if ubulk_file is not None:
+                raise
+            # Decoders don't know package paths, name the missing file here
+            raise FileNotFoundError(errno.ENOENT, str(ex), str(ubulk_path)) from ex
+    return result
+
+
+def safe_extract_asset(asset_path: Path, options: ExtractionOptions) -> ExtractionResult:
+    try:
+        return extract_asset(asset_path, options)
+    except Exception:
+        return ExtractionResult(asset_path, bytes_read=package_size(asset_path), error=traceback.format_exc())
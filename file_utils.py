@@ -1,18 +1,35 @@
 import abc
+import array
 import binascii
 import contextlib
 import io
+import mmap
 import os
 import struct
+import sys
 from pathlib import Path
-from struct import calcsize, pack, unpack
 from typing import Optional, Protocol, Union, TypeVar, Type
 
 
+class StructCache(dict[str, struct.Struct]):
+    def __init__(self, endian: str):
+        super().__init__()
+        self.endian = endian
+
+    def __missing__(self, fmt: str) -> struct.Struct:
+        compiled = self[fmt] = struct.Struct(self.endian + fmt)
+        return compiled
+
+
+LITTLE_ENDIAN_STRUCTS = StructCache('<')
+BIG_ENDIAN_STRUCTS = StructCache('>')
+
+
 class Buffer(abc.ABC, io.RawIOBase):
     def __init__(self):
         io.RawIOBase.__init__(self)
         self._endian = '<'
+        self._structs = LITTLE_ENDIAN_STRUCTS
 
     @contextlib.contextmanager
     def save_current_offset(self):
@@ -59,11 +76,16 @@ class Buffer(abc.ABC, io.RawIOBase):
     def skip(self, size):
         self.seek(size, io.SEEK_CUR)
 
+    def read_view(self, size: int = -1) -> memoryview:
+        return memoryview(self.read(size))
+
     def read_fmt(self, fmt):
-        return unpack(self._endian + fmt, self.read(calcsize(self._endian + fmt)))
+        compiled = self._structs[fmt]
+        return compiled.unpack(self.read(compiled.size))
 
     def _read(self, fmt):
-        return unpack(self._endian + fmt, self.read(calcsize(self._endian + fmt)))[0]
+        compiled = self._structs[fmt]
+        return compiled.unpack(self.read(compiled.size))[0]
 
     def read_relative_offset32(self):
         return self.tell() + self.read_uint32()
@@ -98,6 +120,49 @@ class Buffer(abc.ABC, io.RawIOBase):
     def read_double(self):
         return self._read('d')
 
+    def read_array(self, typecode: str, count: int) -> array.array:
+        values = array.array(typecode)
+        if count == 0:
+            return values
+        size = count * values.itemsize
+        data = self.read_view(size)
+        if len(data) != size:
+            raise BufferError(f"Not enough data left({len(data)}) in buffer to read {count} {typecode!r} values")
+        values.frombytes(data)
+        if (self._endian == '>') != (sys.byteorder == 'big'):
+            values.byteswap()
+        return values
+
+    def read_uint64_array(self, count: int) -> array.array:
+        return self.read_array('Q', count)
+
+    def read_int64_array(self, count: int) -> array.array:
+        return self.read_array('q', count)
+
+    def read_uint32_array(self, count: int) -> array.array:
+        return self.read_array('I', count)
+
+    def read_int32_array(self, count: int) -> array.array:
+        return self.read_array('i', count)
+
+    def read_uint16_array(self, count: int) -> array.array:
+        return self.read_array('H', count)
+
+    def read_int16_array(self, count: int) -> array.array:
+        return self.read_array('h', count)
+
+    def read_uint8_array(self, count: int) -> array.array:
+        return self.read_array('B', count)
+
+    def read_int8_array(self, count: int) -> array.array:
+        return self.read_array('b', count)
+
+    def read_float_array(self, count: int) -> array.array:
+        return self.read_array('f', count)
+
+    def read_double_array(self, count: int) -> array.array:
+        return self.read_array('d', count)
+
     def read_ascii_string(self, length=None):
         if length is not None:
             buffer = self.read(length).strip(b'\x00').rstrip(b'\x00')
@@ -125,7 +190,7 @@ class Buffer(abc.ABC, io.RawIOBase):
         return self.read_ascii_string(4)
 
     def write_fmt(self, fmt: str, *values):
-        self.write(pack(self._endian + fmt, *values))
+        self.write(self._structs[fmt].pack(*values))
 
     def write_uint64(self, value):
         self.write_fmt('Q', value)
@@ -182,9 +247,11 @@ class Buffer(abc.ABC, io.RawIOBase):
 
     def set_big_endian(self):
         self._endian = '>'
+        self._structs = BIG_ENDIAN_STRUCTS
 
     def set_little_endian(self):
         self._endian = '<'
+        self._structs = LITTLE_ENDIAN_STRUCTS
 
     def __bool__(self):
         return self.tell() < self.size()
@@ -218,13 +285,15 @@ class MemoryBuffer(Buffer):
         return len(self._buffer)
 
     def _read(self, fmt: str):
-        data = struct.unpack_from(self._endian + fmt, self._buffer, self._offset)
-        self._offset += struct.calcsize(self._endian + fmt)
+        compiled = self._structs[fmt]
+        data = compiled.unpack_from(self._buffer, self._offset)
+        self._offset += compiled.size
         return data[0]
 
     def read_fmt(self, fmt):
-        data = struct.unpack_from(self._endian + fmt, self._buffer, self._offset)
-        self._offset += struct.calcsize(self._endian + fmt)
+        compiled = self._structs[fmt]
+        data = compiled.unpack_from(self._buffer, self._offset)
+        self._offset += compiled.size
         return data
 
     def write(self, _b: Union[bytes, bytearray]) -> Optional[int]:
@@ -243,6 +312,14 @@ class MemoryBuffer(Buffer):
         self._offset += _size
         return data.tobytes()
 
+    def read_view(self, size: int = -1) -> memoryview:
+        if size == -1:
+            data = self._buffer[self._offset:]
+        else:
+            data = self._buffer[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+
     def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
         if whence == io.SEEK_SET:
             self._offset = offset
@@ -280,6 +357,38 @@ class MemoryBuffer(Buffer):
         return MemoryBuffer(self._buffer[offset:offset + size])
 
 
+class MappedFileBuffer(MemoryBuffer):
+
+    def __init__(self, file: Union[str, Path]) -> None:
+        self.name = file
+        with open(file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self._mmap = None
+                buffer = b''
+            else:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                buffer = self._mmap
+        super().__init__(buffer)
+
+    def __str__(self) -> str:
+        return f'<MappedFileBuffer: {self.name!r} {self.tell()}/{self.size()}>'
+
+    def close(self) -> None:
+        # Views and slices handed out by this buffer (lazy header tables, inline payloads) stay valid after close,
+        # but they keep the mapping alive, and on Windows the file locked, until the last of them is gone.
+        # Anything kept around for long, like caches, should copy the data or read the file into MemoryBuffer.
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Slices are still alive, mapping will be released once they are gone
+                pass
+            self._mmap = None
+
+
 class WritableMemoryBuffer(io.BytesIO, Buffer):
     def __init__(self, initial_bytes=None):
         io.BytesIO.__init__(self, initial_bytes)
@@ -334,6 +443,7 @@ class FileBuffer(io.FileIO, Buffer):
         return f'<FileBuffer: {self.name!r} {self.tell()}/{self.size()}>'
 
     def slice(self, offset: Optional[int] = None, size: int = -1) -> 'Buffer':
+        # Copied out, so slices stay valid after the file is closed and don't share its position between threads
         with self.save_current_offset():
             if offset is not None:
                 self.seek(offset)
@@ -352,4 +462,5 @@ class Readable(Protocol):
         ...
 
 
-__all__ = ['Buffer', 'MemoryBuffer', 'WritableMemoryBuffer', 'FileBuffer', 'Readable']
+__all__ = ['StructCache', 'Buffer', 'MemoryBuffer', 'MappedFileBuffer', 'WritableMemoryBuffer', 'FileBuffer',
+           'Readable']
@@ -29,7 +29,7 @@ class FProperty:
             guid = None
             if has_guid:
                 guid = UUID(bytes=buffer.read(16))
-            return FNameProperty(name, type_name, guid, size).from_value(MemoryBuffer(buffer.read(size)), False)
+            return FNameProperty(name, type_name, guid, size).from_value(MemoryBuffer(buffer.read_view(size)), False)
         elif type_name == "StructProperty":
             return FStructProperty(name, type_name, None, size).from_value(buffer, False)
         elif type_name == "ArrayProperty":
@@ -100,7 +100,7 @@ class FProperty:
         for i in range(count):
             if type_name == "NameProperty":
                 items.append(
-                    FNameProperty(name, type_name, None, size).from_value(MemoryBuffer(buffer.read(size)), False))
+                    FNameProperty(name, type_name, None, size).from_value(MemoryBuffer(buffer.read_view(size)), False))
             elif type_name == "StructProperty":
                 items.append(FStructProperty(name, type_name, None, size).from_value(buffer, i != 0))
             elif type_name == "ArrayProperty":
@@ -257,7 +257,7 @@ class FArrayProperty(FProperty, list[FProperty]):
 
 class FByteProperty(FProperty):
     enum_name: str = field(init=False)
-    payload: bytes = field(init=False)
+    payload: memoryview = field(init=False)
     value: str = field(init=False)
 
     def from_value(self, buffer: Buffer, only_body: bool):
@@ -265,9 +265,9 @@ class FByteProperty(FProperty):
         if not only_body:
             self.enum_name = buffer.read_ue_string()
             assert buffer.read_uint8() == 0
-            self.payload = buffer.read(self.size)
+            self.payload = buffer.read_view(self.size)
         else:
-            self.payload = buffer.read(1)
+            self.payload = buffer.read_view(1)
         if len(self.payload) > 4 and MemoryBuffer(self.payload).read_int32() == self.size - 4:
             self.value = MemoryBuffer(self.payload).read_ue_string()
         return self
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any
+
+from package_files import FileFingerprint, stat_package
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = ".utexturedecoder-manifest.json"
+
+
+@dataclass
+class ManifestEntry:
+    files: dict[str, FileFingerprint]
+    outputs: dict[str, list[str]] = field(default_factory=dict)
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionManifest:
+    # Remembers fingerprint of .uasset/.uexp/.ubulk and outputs produced per export for every extracted package
+
+    def __init__(self, path: Path, dst_root: Path, options: dict[str, Any], use_hash: bool = False):
+        self.path = path
+        self.dst_root = dst_root
+        self.options = options
+        self.use_hash = use_hash
+        self.entries: dict[str, ManifestEntry] = {}
+        # Outputs from manifest written with different options, removed once package is extracted again.
+        # They are saved with the manifest, so packages that fail or are filtered out keep track of them.
+        self._stale_outputs: dict[str, dict[str, list[str]]] = {}
+        # Fingerprints of packages that aren't up to date, taken before they are extracted
+        self._pending_files: dict[str, dict[str, FileFingerprint]] = {}
+        if path.exists():
+            self._load()
+
+    def _load(self):
+        with self.path.open("r", encoding="utf8") as file:
+            data = json.load(file)
+        for key, outputs in data.get("stale_outputs", {}).items():
+            self._add_stale_outputs(key, outputs)
+        if data.get("version") != MANIFEST_VERSION or data.get("options") != self.options:
+            # Outputs were produced with different settings, everything has to be extracted again
+            for key, entry in data.get("entries", {}).items():
+                self._add_stale_outputs(key, entry["outputs"])
+            return
+        for key, entry in data["entries"].items():
+            files = {suffix: FileFingerprint(**fingerprint) for suffix, fingerprint in entry["files"].items()}
+            self.entries[key] = ManifestEntry(files, entry["outputs"])
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "options": self.options,
+            "entries": {key: asdict(entry) for key, entry in sorted(self.entries.items())},
+            "stale_outputs": dict(sorted(self._stale_outputs.items())),
+        }
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with temp_path.open("w", encoding="utf8") as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.path)
+
+    def fingerprint(self, asset_path: Path, previous: ManifestEntry | None = None) -> dict[str, FileFingerprint]:
+        files = stat_package(asset_path)
+        if self.use_hash:
+            for suffix, fingerprint in files.items():
+                old = previous.files.get(suffix) if previous is not None else None
+                # Entries recorded without --hash have no hash yet, it's computed the first time it's needed
+                if (old is not None and old.content_hash is not None
+                        and (old.size, old.mtime_ns) == (fingerprint.size, fingerprint.mtime_ns)):
+                    fingerprint.content_hash = old.content_hash
+                else:
+                    fingerprint.content_hash = hash_file(asset_path.with_suffix(suffix))
+        return files
+
+    def is_up_to_date(self, key: str, asset_path: Path) -> bool:
+        # Packages that aren't up to date remember their fingerprint, record() stores it after extraction,
+        # so files modified while the package is extracted are picked up by the next run
+        entry = self.entries.get(key)
+        files = self.fingerprint(asset_path, entry)
+        if entry is None or not self._matches(entry, files):
+            self._pending_files[key] = files
+            return False
+        # Content is the same, refresh timestamps (and hashes missing so far) so next run doesn't hash again
+        entry.files = files
+        if not all((self.dst_root / output).exists() for outputs in entry.outputs.values() for output in outputs):
+            self._pending_files[key] = files
+            return False
+        return True
+
+    def _matches(self, entry: ManifestEntry, files: dict[str, FileFingerprint]) -> bool:
+        if files.keys() != entry.files.keys():
+            return False
+        for suffix, fingerprint in files.items():
+            old = entry.files[suffix]
+            if self.use_hash and fingerprint.content_hash is not None and old.content_hash is not None:
+                if fingerprint.content_hash != old.content_hash or fingerprint.size != old.size:
+                    return False
+            elif (fingerprint.size, fingerprint.mtime_ns) != (old.size, old.mtime_ns):
+                return False
+        return True
+
+    def record(self, key: str, asset_path: Path, export_outputs: dict[str, list[Path]]):
+        previous = self.entries.get(key)
+        outputs = {export: [output.relative_to(self.dst_root).as_posix() for output in paths]
+                   for export, paths in export_outputs.items()}
+        if previous is not None:
+            self._remove_outputs(previous.outputs, outputs)
+        if key in self._stale_outputs:
+            self._remove_outputs(self._stale_outputs.pop(key), outputs)
+        files = self._pending_files.pop(key, None)
+        if files is None:
+            files = self.fingerprint(asset_path, previous)
+        self.entries[key] = ManifestEntry(files, outputs)
+
+    def prune(self, src_root: Path) -> int:
+        # Drops packages that no longer exist in source tree, together with their outputs
+        removed = 0
+        for key in list(self.entries):
+            if not (src_root / key).exists():
+                self._remove_outputs(self.entries.pop(key).outputs, {})
+                removed += 1
+        for key in list(self._stale_outputs):
+            if not (src_root / key).exists():
+                self._remove_outputs(self._stale_outputs.pop(key), {})
+                removed += 1
+        return removed
+
+    def _add_stale_outputs(self, key: str, outputs: dict[str, list[str]]):
+        stale = self._stale_outputs.setdefault(key, {})
+        for export, paths in outputs.items():
+            stale_paths = stale.setdefault(export, [])
+            for path in paths:
+                if path not in stale_paths:
+                    stale_paths.append(path)
+
+    def _remove_outputs(self, old_outputs: dict[str, list[str]], new_outputs: dict[str, list[str]]):
+        keep = {output for outputs in new_outputs.values() for output in outputs}
+        for outputs in old_outputs.values():
+            for output in outputs:
+                if output in keep:
+                    continue
+                path = self.dst_root / output
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                elif path.exists():
+                    path.unlink()
@@ -0,0 +1,23 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def part1by1(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64) & 0xFFFFFFFF
+    values = (values | (values << 16)) & 0x0000FFFF0000FFFF
+    values = (values | (values << 8)) & 0x00FF00FF00FF00FF
+    values = (values | (values << 4)) & 0x0F0F0F0F0F0F0F0F
+    values = (values | (values << 2)) & 0x3333333333333333
+    values = (values | (values << 1)) & 0x5555555555555555
+    return values
+
+
+@lru_cache(maxsize=64)
+def morton_table(width_in_tiles: int, height_in_tiles: int) -> np.ndarray:
+    # Z-order index of every tile in the grid, indexed as [y, x], x occupies the low bit like UE's MortonCode2
+    x_bits = part1by1(np.arange(width_in_tiles, dtype=np.uint64))
+    y_bits = part1by1(np.arange(height_in_tiles, dtype=np.uint64)) << np.uint64(1)
+    table = (y_bits[:, None] | x_bits[None, :]).astype(np.int64)
+    table.flags.writeable = False
+    return table
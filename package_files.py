@@ -0,0 +1,53 @@
+import fnmatch
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+PACKAGE_SUFFIXES = (".uasset", ".uexp", ".ubulk")
+
+
+@dataclass
+class FileFingerprint:
+    size: int
+    mtime_ns: int
+    content_hash: str | None = None
+
+
+def iter_assets(root: Path, include: Iterable[str] = (), exclude: Iterable[str] = ()) -> Iterator[Path]:
+    include = list(include)
+    exclude = list(exclude)
+    for asset_path in sorted(root.rglob("*.uasset")):
+        relative_path = asset_path.relative_to(root).as_posix()
+        if include and not any(fnmatch.fnmatch(relative_path, pattern) for pattern in include):
+            continue
+        if any(fnmatch.fnmatch(relative_path, pattern) for pattern in exclude):
+            continue
+        yield asset_path
+
+
+def package_size(asset_path: Path) -> int:
+    total = 0
+    for suffix in PACKAGE_SUFFIXES:
+        path = asset_path.with_suffix(suffix)
+        if path.exists():
+            total += path.stat().st_size
+    return total
+
+
+def stat_package(asset_path: Path) -> dict[str, FileFingerprint]:
+    files = {}
+    for suffix in PACKAGE_SUFFIXES:
+        path = asset_path.with_suffix(suffix)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files[suffix] = FileFingerprint(stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def package_fingerprint(asset_path: Path) -> str:
+    files = stat_package(asset_path)
+    return json.dumps({suffix: [fingerprint.size, fingerprint.mtime_ns] for suffix, fingerprint in files.items()},
+                      sort_keys=True)
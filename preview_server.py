@@ -0,0 +1,182 @@
+import asyncio
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from asset import UEAsset, get_export_type
+from file_utils import MappedFileBuffer, MemoryBuffer
+from package_files import stat_package
+from texture_2d import Texture2D
+from tile_cache import DecodedTileCache
+
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class LoadedPackage:
+    asset: UEAsset
+    textures: dict[str, Texture2D]
+
+
+def package_cache_key(asset_path: Path) -> tuple:
+    # Size and mtime of every file of the package, re-cooking any of them makes the package get parsed again
+    return tuple((suffix, fingerprint.size, fingerprint.mtime_ns)
+                 for suffix, fingerprint in stat_package(asset_path).items())
+
+
+@lru_cache(maxsize=256)
+def load_package(asset_path: Path, cache_key: tuple) -> LoadedPackage:
+    # cache_key is part of lru_cache key only. Cached packages live as long as the server, so they must not keep
+    # views of mapped files (that pins the mapping and locks the file on Windows). Header is read into memory,
+    # from .uexp only Texture2D exports are copied, inline mip payloads are views of those copies.
+    asset = UEAsset.from_buffer(MemoryBuffer(asset_path.read_bytes()), lazy=True)
+    textures = {}
+    with MappedFileBuffer(asset_path.with_suffix(".uexp")) as uexp_file:
+        for exported in asset.exported_objects:
+            if get_export_type(exported) != "Texture2D":
+                continue
+            uexp_file.seek(exported.serial_offset - asset.total_header_size)
+            export_buffer = MemoryBuffer(bytes(uexp_file.read_view(exported.serial_size)))
+            textures[exported.object_name] = Texture2D.from_buffer(export_buffer, asset.name_map,
+                                                                   asset.imported_objects, asset.export_size, ())
+    return LoadedPackage(asset, textures)
+
+
+class PreviewServer:
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 8000, workers: int = os.cpu_count() or 1,
+                 cache_bytes: int = 512 * 1024 * 1024):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"Preview server only listens on loopback, got {host!r}")
+        self.root = root.resolve()
+        self.host = host
+        self.port = port
+        self.tile_cache = DecodedTileCache(cache_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def _resolve_texture(self, asset_parts: list[str], export_name: str):
+        asset_path = self.root.joinpath(*asset_parts).with_suffix(".uasset").resolve()
+        if self.root not in asset_path.parents or not asset_path.is_file():
+            raise HTTPError(404, f"Unknown asset {'/'.join(asset_parts)}")
+        package = load_package(asset_path, package_cache_key(asset_path))
+        texture_object = package.textures.get(export_name)
+        if texture_object is None or not texture_object.textures:
+            raise HTTPError(404, f"Unknown texture export {export_name}")
+        # Only the first platform data entry is previewed
+        texture_index = 0
+        return asset_path, texture_index, texture_object.textures[texture_index]
+
+    def _encode_png(self, image) -> bytes:
+        output = io.BytesIO()
+        image.save(output, "PNG", compress_level=1)
+        return output.getvalue()
+
+    def _open_ubulk(self, asset_path: Path):
+        ubulk_path = asset_path.with_suffix(".ubulk")
+        return MappedFileBuffer(ubulk_path) if ubulk_path.exists() else None
+
+    def render_mip(self, asset_parts: list[str], export_name: str, mip: int) -> bytes:
+        asset_path, texture_index, texture = self._resolve_texture(asset_parts, export_name)
+        try:
+            mip = texture.select_mip(mip)
+        except ValueError as ex:
+            raise HTTPError(404, str(ex))
+        tile_cache = self.tile_cache.bind(asset_path, export_name, texture_index)
+        ubulk_file = self._open_ubulk(asset_path)
+        try:
+            return self._encode_png(texture.get_data(ubulk_file, mip=mip, tile_cache=tile_cache))
+        finally:
+            if ubulk_file is not None:
+                ubulk_file.close()
+
+    def render_tile(self, asset_parts: list[str], export_name: str, mip: int, tile_x: int, tile_y: int) -> bytes:
+        asset_path, texture_index, texture = self._resolve_texture(asset_parts, export_name)
+        if not texture.is_virtual:
+            raise HTTPError(400, f"{export_name} is not a virtual texture")
+        tile_size = texture.virtual_texture_build_data.tile_size
+        if not 0 <= mip < texture.mip_count:
+            raise HTTPError(404, f"Mip {mip} is out of range, texture has {texture.mip_count} mips")
+        mip_size_x, mip_size_y = texture.virtual_mip_size(mip)
+        x, y = tile_x * tile_size, tile_y * tile_size
+        if tile_x < 0 or tile_y < 0 or x >= mip_size_x or y >= mip_size_y:
+            raise HTTPError(404, f"Tile {tile_x}x{tile_y} is outside of mip {mip}")
+        tile_cache = self.tile_cache.bind(asset_path, export_name, texture_index)
+        ubulk_file = self._open_ubulk(asset_path)
+        try:
+            return self._encode_png(texture.get_region(ubulk_file, x, y, min(tile_size, mip_size_x - x),
+                                                       min(tile_size, mip_size_y - y), mip, tile_cache=tile_cache))
+        finally:
+            if ubulk_file is not None:
+                ubulk_file.close()
+
+    def route(self, path: str):
+        # /asset/<asset path>/<export>/mip/<n>
+        # /asset/<asset path>/<export>/tile/<mip>/<x>/<y>
+        parts = [unquote(part) for part in urlsplit(path).path.split("/") if part]
+        if parts == ["stats"]:
+            stats = self.tile_cache.stats()
+            body = dict(vars(stats), hit_rate=stats.hit_rate, packages=load_package.cache_info()._asdict())
+            return "application/json", lambda: json.dumps(body).encode("utf8")
+        try:
+            if len(parts) >= 5 and parts[0] == "asset" and parts[-2] == "mip":
+                asset_parts, export_name, mip = parts[1:-3], parts[-3], int(parts[-1])
+                return "image/png", lambda: self.render_mip(asset_parts, export_name, mip)
+            if len(parts) >= 7 and parts[0] == "asset" and parts[-4] == "tile":
+                asset_parts, export_name = parts[1:-5], parts[-5]
+                mip, tile_x, tile_y = (int(part) for part in parts[-3:])
+                return "image/png", lambda: self.render_tile(asset_parts, export_name, mip, tile_x, tile_y)
+        except ValueError:
+            raise HTTPError(400, f"Malformed path {path}")
+        raise HTTPError(404, f"Unknown path {path}")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin1").strip()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            try:
+                if request_line.count(" ") < 2:
+                    raise HTTPError(400, "Malformed request line")
+                method, path, _ = request_line.split(" ", 2)
+                if method != "GET":
+                    raise HTTPError(405, f"Unsupported method {method}")
+                content_type, render = self.route(path)
+                body = await asyncio.get_running_loop().run_in_executor(self._executor, render)
+                status = 200
+            except HTTPError as ex:
+                status, content_type, body = ex.status, "text/plain", ex.message.encode("utf8")
+            except Exception as ex:
+                status, content_type, body = 500, "text/plain", f"{type(ex).__name__}: {ex}".encode("utf8")
+            writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                         f"Content-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode("latin1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Serving {self.root} on http://{self.host}:{self.port}/")
+        async with server:
+            await server.serve_forever()
+
+    def run(self):
+        try:
+            asyncio.run(self.serve_forever())
+        finally:
+            self._executor.shutdown(cancel_futures=True)
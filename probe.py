@@ -0,0 +1,160 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from asset import NameMap, UEAsset, get_export_type, read_name
+from file_utils import Buffer, MappedFileBuffer
+
+# Same bits as texture_2d.UEBulkDataFlags, kept here so probing doesn't import decoders
+BULKDATA_FORCE_INLINE_PAYLOAD = 1 << 6
+BULKDATA_SIZE_64BIT = 1 << 13
+
+BITMASK_CUBEMAP = 1 << 31
+BITMASK_HAS_OPT_DATA = 1 << 30
+BITMASK_NUMSLICES = BITMASK_HAS_OPT_DATA - 1
+
+# Size of tag data that follows property type, for property types that have any
+TAG_DATA_SIZES = {
+    "StructProperty": 8 + 16,
+    "BoolProperty": 1,
+    "EnumProperty": 8,
+    "ByteProperty": 8,
+    "ArrayProperty": 8,
+    "MapProperty": 16,
+    "SetProperty": 8,
+}
+
+
+@dataclass(slots=True)
+class TextureProbe:
+    export_name: str
+    texture_index: int
+    size_x: int
+    size_y: int
+    pixel_format: str
+    slice_count: int
+    cubemap: bool
+    first_mip: int
+    mip_sizes: list[tuple[int, int]]
+    is_virtual: bool
+    tile_size: int = 0
+    tile_border_size: int = 0
+    # Tiles per mip of virtual textures
+    tile_grid: list[tuple[int, int]] = field(default_factory=list)
+    # Pixel format of every virtual texture layer, pixel_format stays the one of platform data
+    layer_pixel_formats: list[str] = field(default_factory=list)
+    bulk_size: int = 0
+    inline_size: int = 0
+
+    @property
+    def mip_count(self) -> int:
+        return len(self.mip_sizes)
+
+    @property
+    def ubulk_size(self) -> int:
+        return self.bulk_size - self.inline_size
+
+
+def skip_properties(buffer: Buffer, name_map: NameMap):
+    # Walks property tags by their sizes without decoding any value
+    while True:
+        if read_name(buffer, name_map) == "None":
+            break
+        prop_type = read_name(buffer, name_map)
+        size = buffer.read_int32()
+        buffer.skip(4 + TAG_DATA_SIZES.get(prop_type, 0))
+        if buffer.read_uint8() != 0:
+            buffer.skip(16)
+        buffer.skip(size)
+    if buffer.read_uint32() != 0:
+        buffer.skip(16)
+
+
+def skip_bulk_data(buffer: Buffer) -> tuple[int, bool]:
+    # Returns payload size and whether it's stored inline, inline payload is skipped over
+    flags = buffer.read_uint32()
+    if flags & BULKDATA_SIZE_64BIT:
+        _, size_on_disk = buffer.read_fmt("2Q")
+    else:
+        _, size_on_disk = buffer.read_fmt("2I")
+    buffer.skip(8)
+    inline = bool(flags & BULKDATA_FORCE_INLINE_PAYLOAD)
+    if inline:
+        buffer.skip(size_on_disk)
+    return size_on_disk, inline
+
+
+def probe_platform_data(buffer: Buffer, export_name: str, texture_index: int) -> TextureProbe:
+    # Mirrors UETexturePlatformData.from_buffer, but keeps only sizes
+    size_x, size_y, packed_data = buffer.read_fmt("3i")
+    pixel_format = buffer.read_ue_string()
+    if packed_data & BITMASK_HAS_OPT_DATA:
+        buffer.skip(8)
+    first_mip, mip_count = buffer.read_fmt("iI")
+    probe = TextureProbe(export_name, texture_index, size_x, size_y, pixel_format, packed_data & BITMASK_NUMSLICES,
+                         bool(packed_data & BITMASK_CUBEMAP), first_mip, [], False)
+    for _ in range(mip_count):
+        buffer.skip(4)
+        size_on_disk, inline = skip_bulk_data(buffer)
+        probe.mip_sizes.append(buffer.read_fmt("2I"))
+        buffer.skip(4)
+        probe.bulk_size += size_on_disk
+        probe.inline_size += size_on_disk if inline else 0
+
+    probe.is_virtual = buffer.read_int32() != 0
+    if not probe.is_virtual:
+        return probe
+    assert first_mip == 0
+    buffer.skip(4)
+    layer_count = buffer.read_uint32()
+    buffer.skip(8)
+    probe.tile_size, probe.tile_border_size = buffer.read_fmt("2I")
+    buffer.skip(12)
+    buffer.skip(buffer.read_uint32() * 4)
+    tile_index_per_mip_count = buffer.read_uint32()
+    buffer.skip(tile_index_per_mip_count * 4)
+    vt_mip_count = max(1, tile_index_per_mip_count - 1)
+    buffer.skip(buffer.read_uint32() * 4)
+    probe.layer_pixel_formats = [buffer.read_ue_string() for _ in range(layer_count)]
+    for _ in range(buffer.read_uint32()):
+        buffer.skip(8 + layer_count * 3)
+        size_on_disk, inline = skip_bulk_data(buffer)
+        probe.bulk_size += size_on_disk
+        probe.inline_size += size_on_disk if inline else 0
+
+    tile_size = probe.tile_size
+    probe.mip_sizes = [(max(1, size_x >> mip), max(1, size_y >> mip)) for mip in range(vt_mip_count)]
+    probe.tile_grid = [(-(-mip_size_x // tile_size), -(-mip_size_y // tile_size))
+                       for mip_size_x, mip_size_y in probe.mip_sizes]
+    return probe
+
+
+def probe_texture_export(buffer: Buffer, name_map: NameMap, export_name: str) -> list[TextureProbe]:
+    # Buffer has to be positioned at the start of serialized Texture2D export
+    skip_properties(buffer, name_map)
+    buffer.skip(4)
+    probes = []
+    if buffer.read_uint32() == 1:
+        while read_name(buffer, name_map) != "None":
+            buffer.skip(8)
+            probes.append(probe_platform_data(buffer, export_name, len(probes)))
+    return probes
+
+
+def probe(asset_path: Path) -> list[TextureProbe]:
+    # Texture metadata of every Texture2D export, reads only package header and .uexp, never .ubulk
+    with MappedFileBuffer(asset_path) as asset_file:
+        asset = UEAsset.from_buffer(asset_file, lazy=True)
+    probes = []
+    uexp_file = None
+    try:
+        for exported in asset.exported_objects:
+            if get_export_type(exported) != "Texture2D":
+                continue
+            if uexp_file is None:
+                uexp_file = MappedFileBuffer(asset_path.with_suffix(".uexp"))
+            uexp_file.seek(exported.serial_offset - asset.total_header_size)
+            probes.extend(probe_texture_export(uexp_file, asset.name_map, exported.object_name))
+    finally:
+        if uexp_file is not None:
+            uexp_file.close()
+    return probes
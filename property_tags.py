@@ -1,14 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Type, Any
 from uuid import UUID
 
-from asset import Name, read_name
-from file_utils import Buffer
+from asset import NameMap, read_name
+from file_utils import Buffer, MemoryBuffer
 
 
 class UEPropertyTagData:
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         raise NotImplementedError()
 
 
@@ -18,13 +18,13 @@ class UEStructPropertyTagData(UEPropertyTagData):
     guid: UUID
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map), UUID(bytes=buffer.read(16)))
 
 
 class UEBoolPropertyTagData(UEPropertyTagData, int):
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(buffer.read_uint8())
 
 
@@ -33,7 +33,7 @@ class UEEnumPropertyTagData(UEPropertyTagData):
     value: str
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map))
 
 
@@ -42,7 +42,7 @@ class UEBytePropertyTagData(UEPropertyTagData):
     value: str
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map))
 
 
@@ -51,7 +51,7 @@ class UEArrayPropertyTagData(UEPropertyTagData):
     value: str
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map))
 
 
@@ -61,7 +61,7 @@ class UEMapPropertyTagData(UEPropertyTagData):
     value_type: str
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map), read_name(buffer, name_map))
 
 
@@ -70,7 +70,7 @@ class UESetPropertyTagData(UEPropertyTagData):
     value_type: str
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name]):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap):
         return cls(read_name(buffer, name_map))
 
 
@@ -87,14 +87,14 @@ TAG_DATA: dict[str, Type[UEPropertyTagData]] = {
 
 class UEPropertyTag:
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         raise NotImplementedError()
 
 
 class UEBoolPropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         assert isinstance(tag_data, UEBoolPropertyTagData)
         return cls(tag_data)
 
@@ -102,49 +102,49 @@ class UEBoolPropertyTag(UEPropertyTag, int):
 class UEInt8PropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_int8())
 
 
 class UEInt16PropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_int16())
 
 
 class UEUInt16PropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_uint16())
 
 
 class UEIntPropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_int32())
 
 
 class UEUInt32PropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_uint32())
 
 
 class UEUInt64PropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_uint64())
 
 
 class UEFloatPropertyTag(UEPropertyTag, float):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         return cls(buffer.read_float())
 
 
@@ -153,14 +153,14 @@ class UENamePropertyTag(UEPropertyTag):
     value: str
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         raise NotImplementedError()
 
 
 class UEBytePropertyTag(UEPropertyTag, int):
 
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         assert isinstance(tag_data, UEBytePropertyTagData)
         if tag_data.value == "None":
             return cls(buffer.read_uint8())
@@ -169,7 +169,7 @@ class UEBytePropertyTag(UEPropertyTag, int):
 
 class UEStructPropertyTag(UEPropertyTag, dict[str, Any]):
     @classmethod
-    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: list[Name], tag_data: UEPropertyTagData):
+    def from_buffer_and_tag_data(cls, buffer: Buffer, name_map: NameMap, tag_data: UEPropertyTagData):
         assert isinstance(tag_data, UEStructPropertyTagData)
         name = tag_data.name
         if name == "IntPoint":
@@ -210,4 +210,18 @@ class UEPropertyTag:
     size: int
     array_index: int
     guid: UUID
-    tag: UEPropertyTag
+    tag: UEPropertyTag | None = None
+    # Undecoded value of selectively parsed tags, see decode()
+    payload: memoryview | None = field(default=None, repr=False, compare=False)
+    name_map: NameMap | None = field(default=None, repr=False, compare=False)
+
+    def decode(self) -> UEPropertyTag | None:
+        # Decodes value from payload once, payload is dropped afterwards
+        if self.payload is not None:
+            tag_type = TAGS.get(self.type, None)
+            if tag_type is None:
+                raise NotImplementedError(self.type)
+            self.tag = tag_type.from_buffer_and_tag_data(MemoryBuffer(self.payload), self.name_map, self.data)
+            self.payload = None
+            self.name_map = None
+        return self.tag
@@ -0,0 +1,145 @@
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from file_utils import Buffer
+from texture_2d import UETexturePlatformData, pil_image
+
+STREAM_FORMATS = ("tiff", "raw", "tiles")
+
+TIFF_SHORT = 3
+TIFF_LONG = 4
+TIFF_LONG8 = 16
+
+
+class StripedTiffWriter:
+    # Uncompressed, strip based TIFF written front to back, so pixels can be appended band by band.
+    # Switches to BigTIFF when pixel data does not fit into 32bit offsets.
+
+    def __init__(self, file: BinaryIO, width: int, height: int, channels: int, rows_per_strip: int):
+        self._file = file
+        self._row_size = width * channels
+        data_size = self._row_size * height
+        self._big = data_size + 4096 > 0xFFFFFFFF
+        strip_count = -(-height // rows_per_strip)
+        strip_sizes = [self._row_size * min(rows_per_strip, height - strip * rows_per_strip)
+                       for strip in range(strip_count)]
+
+        offset_type = TIFF_LONG8 if self._big else TIFF_LONG
+        entries = [
+            (256, TIFF_LONG, [width]),
+            (257, TIFF_LONG, [height]),
+            (258, TIFF_SHORT, [8] * channels),
+            (259, TIFF_SHORT, [1]),
+            (262, TIFF_SHORT, [2 if channels >= 3 else 1]),
+            (273, offset_type, [0] * strip_count),
+            (277, TIFF_SHORT, [channels]),
+            (278, TIFF_LONG, [rows_per_strip]),
+            (279, offset_type, strip_sizes),
+            (284, TIFF_SHORT, [1]),
+        ]
+        if channels in (2, 4):
+            entries.append((338, TIFF_SHORT, [2]))
+
+        header_size = 16 if self._big else 8
+        ifd_size = (8 + len(entries) * 20 + 8) if self._big else (2 + len(entries) * 12 + 4)
+        extra_offset = header_size + ifd_size
+        extra_size = sum(len(self._encode_values(value_type, values)) for _, value_type, values in entries
+                         if not self._is_inline(value_type, values))
+        data_offset = extra_offset + extra_size
+        strip_offsets = []
+        for strip_size in strip_sizes:
+            strip_offsets.append(data_offset)
+            data_offset += strip_size
+        entries[5] = (273, offset_type, strip_offsets)
+        self._write_header(entries, header_size, extra_offset)
+
+    def _is_inline(self, value_type: int, values: list[int]) -> bool:
+        return len(self._encode_values(value_type, values)) <= (8 if self._big else 4)
+
+    @staticmethod
+    def _encode_values(value_type: int, values: list[int]) -> bytes:
+        fmt = {TIFF_SHORT: 'H', TIFF_LONG: 'I', TIFF_LONG8: 'Q'}[value_type]
+        return struct.pack(f'<{len(values)}{fmt}', *values)
+
+    def _write_header(self, entries, header_size: int, extra_offset: int):
+        inline_size = 8 if self._big else 4
+        if self._big:
+            header = struct.pack('<2sHHHQ', b'II', 43, 8, 0, header_size)
+            ifd = struct.pack('<Q', len(entries))
+        else:
+            header = struct.pack('<2sHI', b'II', 42, header_size)
+            ifd = struct.pack('<H', len(entries))
+        extra = b''
+        for tag, value_type, values in entries:
+            encoded = self._encode_values(value_type, values)
+            if len(encoded) <= inline_size:
+                value = encoded.ljust(inline_size, b'\x00')
+            else:
+                value = struct.pack('<Q' if self._big else '<I', extra_offset + len(extra))
+                extra += encoded
+            ifd += struct.pack('<HHQ' if self._big else '<HHI', tag, value_type, len(values)) + value
+        ifd += struct.pack('<Q' if self._big else '<I', 0)
+        self._file.write(header + ifd + extra)
+
+    def write_rows(self, pixels: np.ndarray):
+        self._file.write(np.ascontiguousarray(pixels).data)
+
+
+class RawWriter:
+    # Headerless planar 8bit pixels: one width x height plane per channel in R, G, B(, A) order,
+    # rows of every plane go top to bottom. Bands are written into every plane at their row offset.
+
+    def __init__(self, file: BinaryIO, width: int, height: int, channels: int):
+        self._file = file
+        self._width = width
+        self._plane_size = width * height
+        self._channels = channels
+        self._row = 0
+        self._file.truncate(self._plane_size * channels)
+
+    def write_rows(self, pixels: np.ndarray):
+        if pixels.ndim == 2:
+            pixels = pixels[:, :, np.newaxis]
+        assert pixels.shape[1] == self._width and pixels.shape[2] == self._channels
+        for channel in range(self._channels):
+            self._file.seek(channel * self._plane_size + self._row * self._width)
+            self._file.write(np.ascontiguousarray(pixels[:, :, channel]).data)
+        self._row += pixels.shape[0]
+
+
+def stream_virtual_texture(texture: UETexturePlatformData, ubulk_file: Buffer, output_path: Path,
+                           output_format: str = "tiff", band_rows: int = 1, threads: int = 1,
+                           mip: int = 0) -> list[Path]:
+    assert texture.is_virtual
+    if output_format not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported stream format {output_format!r}")
+    tile_size = texture.virtual_texture_build_data.tile_size
+    mip_size_x, mip_size_y = texture.virtual_mip_size(mip)
+    bands = texture.iter_virtual_bands(ubulk_file, band_rows, threads, mip)
+
+    if output_format == "tiles":
+        Image = pil_image()
+        output_path.mkdir(parents=True, exist_ok=True)
+        outputs = []
+        for y, band in bands:
+            for band_y in range(0, band.shape[0], tile_size):
+                tile_y = (y + band_y) // tile_size
+                for x in range(0, mip_size_x, tile_size):
+                    tile_path = output_path / f"{x // tile_size}_{tile_y}.png"
+                    Image.fromarray(band[band_y:band_y + tile_size, x:x + tile_size]).save(tile_path)
+                    outputs.append(tile_path)
+        return outputs
+
+    with output_path.open("wb") as output_file:
+        writer: StripedTiffWriter | RawWriter
+        if output_format == "tiff":
+            writer = StripedTiffWriter(output_file, mip_size_x, mip_size_y, texture.virtual_channel_count(),
+                                       band_rows * tile_size)
+        else:
+            writer = RawWriter(output_file, mip_size_x, mip_size_y, texture.virtual_channel_count())
+        for _, band in bands:
+            writer.write_rows(band)
+    return [output_path]
@@ -1,12 +1,18 @@
 import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property
 from enum import IntEnum, IntFlag
+from typing import BinaryIO, Collection
 
-from PIL import Image
-from pyzorder import ZOrderIndexer
+import numpy as np
 
-from asset import UEImportObject, Name, read_name
-from file_utils import Buffer, MemoryBuffer
+from asset import NameMap, UEImportObject, read_name
+from dds import DDS_FORMATS, dds_surface_size, get_dds_format, write_dds_header
+from file_utils import Buffer
+from morton import morton_table
+from tile_cache import BoundTileCache
 from ue_object import UEObject
 
 
@@ -59,7 +65,7 @@ class UEBulkDataFlags(IntFlag):
     BULKDATA_AlwaysAllowDiscard = 1 << 28
 
 
-@dataclass
+@dataclass(slots=True)
 class UEByteBulkData:
     bulk_data_flags: UEBulkDataFlags
     element_count: int
@@ -80,7 +86,8 @@ class UEByteBulkData:
         offset_in_file = buffer.read_uint64()
         inline_data: Buffer | None = None
         if flags & UEBulkDataFlags.BULKDATA_ForceInlinePayload:
-            inline_data = MemoryBuffer(buffer.read(size_on_disk))
+            inline_data = buffer.slice(buffer.tell(), size_on_disk)
+            buffer.skip(size_on_disk)
 
         return cls(flags, element_count, size_on_disk, offset_in_file, inline_data)
 
@@ -96,7 +103,7 @@ class UEVirtualTextureCodec(IntEnum):
     Max = 7  # Add new codecs before this entry
 
 
-@dataclass
+@dataclass(slots=True)
 class VirtualTextureDataChunk:
     bulk_data: UEByteBulkData
     size_in_bytes: int
@@ -117,7 +124,7 @@ class VirtualTextureDataChunk:
         return cls(bulk_data, size_in_bytes, codec_payload_size, codec_payload_offsets, codec_types)
 
 
-@dataclass
+@dataclass(slots=True)
 class UETexture2DMipMap:
     cooked: bool
     data: UEByteBulkData
@@ -135,14 +142,14 @@ class UEVirtualTextureTileOffsetData:
     width: int
     height: int
     max_address: int
-    addresses: list[int]
-    offsets: list[int]
+    addresses: array
+    offsets: array
 
     @classmethod
     def from_buffer(cls, buffer: Buffer):
         return cls(buffer.read_uint32(), buffer.read_uint32(), buffer.read_uint32(),
-                   [buffer.read_uint32() for _ in range(buffer.read_uint32())],
-                   [buffer.read_uint32() for _ in range(buffer.read_uint32())])
+                   buffer.read_uint32_array(buffer.read_uint32()),
+                   buffer.read_uint32_array(buffer.read_uint32()))
 
 
 @dataclass
@@ -155,9 +162,9 @@ class UEVirtualTextureBuiltData:
     tile_size: int
     tile_border_size: int
 
-    tile_index_per_chunk: list[int]
-    tile_index_per_mip: list[int]
-    tile_offset_in_chunk: list[int]
+    tile_index_per_chunk: array
+    tile_index_per_mip: array
+    tile_offset_in_chunk: array
 
     layer_pixel_formats: list[str]
 
@@ -174,9 +181,9 @@ class UEVirtualTextureBuiltData:
         tile_size = buffer.read_uint32()
         tile_border_size = buffer.read_uint32()
 
-        tile_index_per_chunk = []
-        tile_index_per_mip = []
-        tile_offset_in_chunk = []
+        tile_index_per_chunk = array('I')
+        tile_index_per_mip = array('I')
+        tile_offset_in_chunk = array('I')
 
         if strip_mips:
             assert False
@@ -185,9 +192,9 @@ class UEVirtualTextureBuiltData:
             width = buffer.read_uint32()
             height = buffer.read_uint32()
 
-            tile_index_per_chunk = [buffer.read_uint32() for _ in range(buffer.read_uint32())]
-            tile_index_per_mip = [buffer.read_uint32() for _ in range(buffer.read_uint32())]
-            tile_offset_in_chunk = [buffer.read_uint32() for _ in range(buffer.read_uint32())]
+            tile_index_per_chunk = buffer.read_uint32_array(buffer.read_uint32())
+            tile_index_per_mip = buffer.read_uint32_array(buffer.read_uint32())
+            tile_offset_in_chunk = buffer.read_uint32_array(buffer.read_uint32())
 
         layer_pf = []
         for _ in range(layer_count):
@@ -200,11 +207,34 @@ class UEVirtualTextureBuiltData:
                    tile_index_per_chunk, tile_index_per_mip, tile_offset_in_chunk, layer_pf, chunks)
 
 
+# Pillow mode, channel count and bcn decoder arguments of virtual texture layer formats
+VT_PIXEL_FORMATS: dict[str, tuple[str, int, tuple[int, str]]] = {
+    "PF_DXT1": ("RGBA", 4, (1, "DXT1")),
+    "PF_BC5": ("RGB", 3, (5, "BC5")),
+}
+
+# Tiles closer than this are read together, skipping the bytes in between
+TILE_RUN_MAX_GAP = 64 * 1024
+# Upper bound of a single coalesced read
+TILE_RUN_MAX_SIZE = 64 * 1024 * 1024
+
 BITMASK_CUBEMAP = 1 << 31
 BITMASK_HAS_OPT_DATA = 1 << 30
 BITMASK_NUMSLICES = BITMASK_HAS_OPT_DATA - 1
 
 
+def pil_image():
+    # Pillow is only needed once something gets decoded, so parsing doesn't pay for importing it
+    from PIL import Image
+    return Image
+
+
+def require_ubulk(ubulk_file: Buffer | None, payload: str):
+    # Payloads that aren't inline live in .ubulk next to .uasset, callers pass None when it doesn't exist
+    if ubulk_file is None:
+        raise FileNotFoundError(f"{payload} payload is stored in .ubulk file of the package, but it is missing")
+
+
 @dataclass
 class UETexturePlatformData:
     size_x: int
@@ -235,67 +265,55 @@ class UETexturePlatformData:
         return cls(size_x, size_y, slice_count, packed_data & BITMASK_CUBEMAP, pf, first_mip, mips, is_virtual,
                    virtual_texture_build_data)
 
-    def get_data(self, ubulk_file: Buffer):
+    @property
+    def mip_count(self) -> int:
         if self.is_virtual:
-            virtual_texture = self.virtual_texture_build_data
-            chunk = virtual_texture.chunks[0]
-            assert len(chunk.codec_type) == 1
-            chunk_offset = 0
-            full_texture = Image.new("RGBA", (self.size_x, self.size_y))
-            tile_size = virtual_texture.tile_size
-            border_size = virtual_texture.tile_border_size
-
-            rows = self.size_x // tile_size
-            columns = self.size_y // tile_size
-
-            zi = ZOrderIndexer((0, rows), (0, columns))
-            for row in range(rows):
-                for column in range(columns):
-                    tile_id = zi.zindex(row, column)
-                    tile_offset = virtual_texture.tile_offset_in_chunk[tile_id]
-                    if (tile_id + 1) > len(virtual_texture.tile_offset_in_chunk):
-                        next_tile_offset = chunk_offset + chunk.size_in_bytes
-                    else:
-                        next_tile_offset = chunk_offset + virtual_texture.tile_offset_in_chunk[tile_id + 1]
-                    ubulk_file.seek(chunk_offset + tile_offset)
-                    data = ubulk_file.read(next_tile_offset - (chunk_offset + tile_offset))
-                    if next_tile_offset - (chunk_offset + tile_offset) == 0:
-                        continue
-                    if UEVirtualTextureCodec.ZippedGPU == chunk.codec_type[0]:
-                        data = zlib.decompress(data)
-                    if virtual_texture.layer_pixel_formats[0] == "PF_DXT1":
-                        tile = Image.frombytes("RGBA",
-                                               (tile_size + border_size * 2,
-                                                tile_size + border_size * 2),
-                                               data, "bcn", (1, "DXT1"))
-                    elif virtual_texture.layer_pixel_formats[0] == "PF_BC5":
-                        tile = Image.frombytes("RGB",
-                                               (tile_size + border_size * 2,
-                                                tile_size + border_size * 2),
-                                               data, "bcn", (5, "BC5"))
-                    else:
-                        raise NotImplementedError()
-                    borderless_tile = tile.crop((border_size, border_size,
-                                                 tile_size + border_size,
-                                                 tile_size + border_size))
-                    full_texture.paste(borderless_tile, (row * tile_size, column * tile_size,))
-            return full_texture
+            return max(1, len(self.virtual_texture_build_data.tile_index_per_mip) - 1)
+        return len(self.mips)
+
+    def mip_size(self, mip: int) -> tuple[int, int]:
+        if self.is_virtual:
+            return self.virtual_mip_size(mip)
+        return self.mips[mip].size_x, self.mips[mip].size_y
+
+    def has_mip_payload(self, mip: int) -> bool:
+        # Regular mips without payload (stripped or not cooked) can't be decoded
+        return self.is_virtual or self.mips[mip].data.size_on_disk > 0
+
+    def select_mip(self, mip: int | None = None, max_size: int | None = None) -> int:
+        if mip is not None:
+            if not 0 <= mip < self.mip_count:
+                raise ValueError(f"Mip {mip} is out of range, texture has {self.mip_count} mips")
+            if not self.has_mip_payload(mip):
+                raise ValueError(f"Mip {mip} has no payload, it was stripped or not cooked")
+            return mip
+        candidates = [mip for mip in range(self.mip_count) if self.has_mip_payload(mip)]
+        if not candidates:
+            raise ValueError(f"None of {self.mip_count} mips has payload, they were stripped or not cooked")
+        candidates.sort(key=lambda mip: max(self.mip_size(mip)))
+        if max_size is not None:
+            # Smallest mip that is still at least max_size, otherwise the biggest one available
+            for mip in candidates:
+                if max(self.mip_size(mip)) >= max_size:
+                    return mip
+        return candidates[-1]
+
+    def get_data(self, ubulk_file: Buffer | None, threads: int = 1, mip: int | None = None,
+                 max_size: int | None = None, tile_cache: BoundTileCache | None = None):
+        Image = pil_image()
+
+        mip = self.select_mip(mip, max_size)
+        if self.is_virtual:
+            return self._get_virtual_data(ubulk_file, threads, mip, tile_cache)
         else:
-            biggest_mip = None
-            biggest_dim = 0
-            for mip in self.mips:
-                if max(mip.size_y, mip.size_x) > biggest_dim:
-                    biggest_mip = mip
-                    biggest_dim = max(mip.size_y, mip.size_x)
-            bulk_data = biggest_mip.data
-            if bulk_data.inline_data is not None:
-                buffer = bulk_data.inline_data
-            else:
-                ubulk_file.seek(biggest_mip.data.offset_in_file)
-                buffer = ubulk_file
-            data = buffer.read(bulk_data.size_on_disk)
-            dim = (biggest_mip.size_x,
-                   biggest_mip.size_y)
+            if tile_cache is not None:
+                pixels = tile_cache.get((None, mip, None))
+                if pixels is not None:
+                    return Image.fromarray(pixels)
+            selected_mip = self.mips[mip]
+            data = self._read_mip_payload(ubulk_file, mip)
+            dim = (selected_mip.size_x,
+                   selected_mip.size_y)
             tile: Image.Image
             if self.pixel_format == "PF_DXT1":
                 tile = Image.frombytes("RGBA",
@@ -315,8 +333,298 @@ class UETexturePlatformData:
                 tile = Image.merge("RGBA", (r, g, b, a))
             else:
                 raise NotImplementedError(self.pixel_format)
+            if tile_cache is not None:
+                tile_cache.put((None, mip, None), np.asarray(tile))
             return tile
 
+    def _read_mip_payload(self, ubulk_file: Buffer | None, mip: int):
+        bulk_data = self.mips[mip].data
+        if bulk_data.inline_data is not None:
+            # Slicing data instead of seeking keeps shared parsed textures safe to decode from multiple threads
+            return bulk_data.inline_data.data[:bulk_data.size_on_disk]
+        require_ubulk(ubulk_file, f"Mip {mip}")
+        ubulk_file.seek(bulk_data.offset_in_file)
+        return ubulk_file.read_view(bulk_data.size_on_disk)
+
+    def dds_layer_count(self) -> int:
+        return max(self.slice_count, 6 if self.cubemap else 1)
+
+    def supports_dds_passthrough(self) -> bool:
+        if not self.is_virtual:
+            return self.pixel_format in DDS_FORMATS
+        virtual_texture = self.virtual_texture_build_data
+        dds_format = DDS_FORMATS.get(virtual_texture.layer_pixel_formats[0])
+        # Tile borders can only be dropped when they consist of whole blocks
+        return (virtual_texture.layer_count == 1 and dds_format is not None
+                and virtual_texture.tile_size % dds_format.block_size == 0
+                and virtual_texture.tile_border_size % dds_format.block_size == 0)
+
+    def to_dds(self, ubulk_file: Buffer | None, output_file: BinaryIO, mip: int | None = None,
+               max_size: int | None = None) -> int:
+        # Copies GPU ready mip payloads into DDS container as they are, returns number of mips written
+        first_mip = self.select_mip(mip, max_size)
+        if self.is_virtual:
+            return self._virtual_to_dds(ubulk_file, output_file, first_mip)
+        mip_count = 1
+        while first_mip + mip_count < len(self.mips) and self.mips[first_mip + mip_count].data.size_on_disk > 0:
+            mip_count += 1
+        dds_format = get_dds_format(self.pixel_format)
+        layer_count = self.dds_layer_count()
+        payloads = []
+        for mip in range(first_mip, first_mip + mip_count):
+            payload = self._read_mip_payload(ubulk_file, mip)
+            mip_map = self.mips[mip]
+            layer_size = dds_surface_size(dds_format, mip_map.size_x, mip_map.size_y)
+            if len(payload) < layer_size * layer_count:
+                raise ValueError(f"Mip {mip} payload is {len(payload)} bytes, "
+                                 f"expected {layer_size * layer_count} for {self.pixel_format}")
+            payloads.append((payload, layer_size))
+
+        top_mip = self.mips[first_mip]
+        write_dds_header(output_file, self.pixel_format, top_mip.size_x, top_mip.size_y, mip_count, layer_count,
+                         bool(self.cubemap))
+        # Unreal stores all slices of a mip together, DDS stores full mip chain of every slice one after another
+        for layer in range(layer_count):
+            for payload, layer_size in payloads:
+                output_file.write(payload[layer * layer_size:(layer + 1) * layer_size])
+        return mip_count
+
+    def _virtual_to_dds(self, ubulk_file: Buffer, output_file: BinaryIO, first_mip: int = 0) -> int:
+        # Stitches compressed blocks of all tiles into one surface per mip, one tile row at a time
+        if not self.supports_dds_passthrough():
+            raise NotImplementedError("Virtual texture tiles can't be stitched without decoding")
+        virtual_texture = self.virtual_texture_build_data
+        pixel_format = virtual_texture.layer_pixel_formats[0]
+        dds_format = get_dds_format(pixel_format)
+        block_size, block_bytes = dds_format.block_size, dds_format.block_bytes
+        tile_blocks = virtual_texture.tile_size // block_size
+        border_blocks = virtual_texture.tile_border_size // block_size
+        full_tile_blocks = tile_blocks + border_blocks * 2
+        full_tile_bytes = full_tile_blocks * full_tile_blocks * block_bytes
+
+        mip_count = self.mip_count - first_mip
+        write_dds_header(output_file, pixel_format, *self.virtual_mip_size(first_mip), mip_count)
+        for mip in range(first_mip, self.mip_count):
+            mip_size_x, mip_size_y = self.virtual_mip_size(mip)
+            blocks_x = -(-mip_size_x // block_size)
+            blocks_y = -(-mip_size_y // block_size)
+            tiles_x = -(-mip_size_x // virtual_texture.tile_size)
+            band = np.zeros((tile_blocks, tiles_x * tile_blocks, block_bytes), np.uint8)
+            for tile_row in range(-(-mip_size_y // virtual_texture.tile_size)):
+                band.fill(0)
+                for tile_x, _, _, data, codec in self._read_virtual_tiles(ubulk_file, range(tile_row, tile_row + 1),
+                                                                          mip=mip):
+                    if UEVirtualTextureCodec.ZippedGPU == codec:
+                        data = zlib.decompress(data)
+                    blocks = np.frombuffer(data, np.uint8, full_tile_bytes)
+                    blocks = blocks.reshape(full_tile_blocks, full_tile_blocks, block_bytes)
+                    band[:, tile_x * tile_blocks:(tile_x + 1) * tile_blocks] = \
+                        blocks[border_blocks:border_blocks + tile_blocks, border_blocks:border_blocks + tile_blocks]
+                band_height = min(tile_blocks, blocks_y - tile_row * tile_blocks)
+                output_file.write(np.ascontiguousarray(band[:band_height, :blocks_x]).data)
+        return mip_count
+
+    def virtual_mip_size(self, mip: int = 0) -> tuple[int, int]:
+        return max(1, self.size_x >> mip), max(1, self.size_y >> mip)
+
+    @cached_property
+    def _virtual_tile_ranges(self):
+        # Chunk index, start and end offset within chunk of every tile id
+        virtual_texture = self.virtual_texture_build_data
+        tile_offsets = np.frombuffer(virtual_texture.tile_offset_in_chunk, np.uint32).astype(np.int64)
+        tile_count = len(tile_offsets)
+        chunk_first_tiles = np.array(virtual_texture.tile_index_per_chunk or [0, tile_count], np.int64)
+        chunk_count = len(virtual_texture.chunks)
+        tile_ids = np.arange(tile_count)
+        tile_chunks = np.clip(np.searchsorted(chunk_first_tiles, tile_ids, side="right") - 1, 0, chunk_count - 1)
+        chunk_sizes = np.array([chunk.size_in_bytes for chunk in virtual_texture.chunks], np.int64)
+        # Last tile in chunk ends where chunk ends
+        last_in_chunk = np.isin(tile_ids + 1, chunk_first_tiles[1:]) | (tile_ids == tile_count - 1)
+        tile_ends = np.where(last_in_chunk, chunk_sizes[tile_chunks], np.append(tile_offsets[1:], 0))
+        return tile_chunks, tile_offsets, tile_ends
+
+    def _virtual_tile_layout(self, mip: int = 0):
+        virtual_texture = self.virtual_texture_build_data
+        tile_size = virtual_texture.tile_size
+        mip_size_x, mip_size_y = self.virtual_mip_size(mip)
+        tiles_x = -(-mip_size_x // tile_size)
+        tiles_y = -(-mip_size_y // tile_size)
+        tile_ids = morton_table(tiles_x, tiles_y)
+        if virtual_texture.tile_index_per_mip:
+            tile_ids = tile_ids + virtual_texture.tile_index_per_mip[mip]
+        tile_chunks, tile_starts, tile_ends = self._virtual_tile_ranges
+        return tiles_x, tiles_y, tile_ids, tile_chunks[tile_ids], tile_starts[tile_ids], tile_ends[tile_ids]
+
+    def _read_virtual_tiles(self, ubulk_file: Buffer, tile_rows: range | None = None,
+                            tile_columns: range | None = None, mip: int = 0,
+                            tile_cache: BoundTileCache | None = None):
+        # Yields (tile_x, tile_y, cache key, data, codec), codec is None when data is already decoded cached pixels
+        virtual_texture = self.virtual_texture_build_data
+        assert all(len(chunk.codec_type) == 1 for chunk in virtual_texture.chunks)
+
+        tiles_x, tiles_y, tile_ids, tile_chunks, tile_starts, tile_ends = self._virtual_tile_layout(mip)
+        if tile_rows is None:
+            tile_rows = range(tiles_y)
+        if tile_columns is None:
+            tile_columns = range(tiles_x)
+        window = (slice(tile_rows.start, tile_rows.stop), slice(tile_columns.start, tile_columns.stop))
+        tile_ids = tile_ids[window].ravel()
+        tile_chunks = tile_chunks[window].ravel()
+        tile_starts = tile_starts[window].ravel()
+        tile_ends = tile_ends[window].ravel()
+        tiles = (tile_columns, tile_rows, mip, tile_ids, tile_chunks, tile_starts, tile_ends)
+
+        # Tiles sorted in file order (Morton order within chunk) are read as few large sequential runs,
+        # every tile is then handed out as a slice of its run
+        order = []
+        for tile_index in np.lexsort((tile_starts, tile_chunks)).tolist():
+            if tile_ends[tile_index] <= tile_starts[tile_index]:
+                continue
+            if tile_cache is not None:
+                tile_key = (int(tile_chunks[tile_index]), mip, int(tile_ids[tile_index]))
+                pixels = tile_cache.get(tile_key)
+                if pixels is not None:
+                    tile_y, tile_x = divmod(tile_index, len(tile_columns))
+                    yield tile_columns.start + tile_x, tile_rows.start + tile_y, tile_key, pixels, None
+                    continue
+            order.append(tile_index)
+
+        run: list[int] = []
+        for tile_index in order:
+            if run:
+                run_start, run_chunk = int(tile_starts[run[0]]), int(tile_chunks[run[0]])
+                if (int(tile_chunks[tile_index]) != run_chunk
+                        or int(tile_starts[tile_index]) - int(tile_ends[run[-1]]) > TILE_RUN_MAX_GAP
+                        or int(tile_ends[tile_index]) - run_start > TILE_RUN_MAX_SIZE):
+                    yield from self._split_tile_run(ubulk_file, run, tiles)
+                    run = []
+            run.append(tile_index)
+        if run:
+            yield from self._split_tile_run(ubulk_file, run, tiles)
+
+    def _split_tile_run(self, ubulk_file: Buffer, run: list[int], tiles):
+        tile_columns, tile_rows, mip, tile_ids, tile_chunks, tile_starts, tile_ends = tiles
+        chunk_index = int(tile_chunks[run[0]])
+        chunk = self.virtual_texture_build_data.chunks[chunk_index]
+        run_start = int(tile_starts[run[0]])
+        run_end = max(int(tile_ends[tile_index]) for tile_index in run)
+        if chunk.bulk_data.inline_data is not None:
+            run_data = chunk.bulk_data.inline_data.data[run_start:run_end]
+        else:
+            require_ubulk(ubulk_file, f"Virtual texture chunk {chunk_index}")
+            ubulk_file.seek(chunk.bulk_data.offset_in_file + run_start)
+            run_data = ubulk_file.read_view(run_end - run_start)
+        codec = chunk.codec_type[0]
+        for tile_index in run:
+            tile_y, tile_x = divmod(tile_index, len(tile_columns))
+            tile_data = run_data[int(tile_starts[tile_index]) - run_start:int(tile_ends[tile_index]) - run_start]
+            yield (tile_columns.start + tile_x, tile_rows.start + tile_y,
+                   (chunk_index, mip, int(tile_ids[tile_index])), tile_data, codec)
+
+    def _decode_virtual_tile(self, data, codec: UEVirtualTextureCodec) -> np.ndarray:
+        Image = pil_image()
+
+        virtual_texture = self.virtual_texture_build_data
+        tile_size = virtual_texture.tile_size
+        border_size = virtual_texture.tile_border_size
+        full_tile_size = tile_size + border_size * 2
+        if UEVirtualTextureCodec.ZippedGPU == codec:
+            data = zlib.decompress(data)
+        pixel_format = virtual_texture.layer_pixel_formats[0]
+        if pixel_format not in VT_PIXEL_FORMATS:
+            raise NotImplementedError(pixel_format)
+        mode, _, decoder_args = VT_PIXEL_FORMATS[pixel_format]
+        tile = np.asarray(Image.frombytes(mode, (full_tile_size, full_tile_size), data, "bcn", decoder_args))
+        return tile[border_size:border_size + tile_size, border_size:border_size + tile_size]
+
+    def virtual_channel_count(self) -> int:
+        pixel_format = self.virtual_texture_build_data.layer_pixel_formats[0]
+        if pixel_format not in VT_PIXEL_FORMATS:
+            raise NotImplementedError(pixel_format)
+        return VT_PIXEL_FORMATS[pixel_format][1]
+
+    def _decode_virtual_tiles_into(self, target: np.ndarray, tiles, first_tile_x: int = 0, first_tile_y: int = 0,
+                                   threads: int = 1, tile_cache: BoundTileCache | None = None):
+        tile_size = self.virtual_texture_build_data.tile_size
+
+        def decode_into(tile_x: int, tile_y: int, tile_key, data, codec: UEVirtualTextureCodec | None):
+            # Every tile owns a disjoint region of target, so workers can write without locking
+            x, y = (tile_x - first_tile_x) * tile_size, (tile_y - first_tile_y) * tile_size
+            region = target[y:y + tile_size, x:x + tile_size]
+            if codec is None:
+                pixels = data
+            else:
+                pixels = self._decode_virtual_tile(data, codec)
+                if tile_cache is not None:
+                    pixels = tile_cache.put(tile_key, pixels)
+            region[...] = pixels[:region.shape[0], :region.shape[1]]
+
+        if threads > 1:
+            # zlib and Pillow decoders release the GIL
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                for future in [executor.submit(decode_into, *tile) for tile in tiles]:
+                    future.result()
+        else:
+            for tile in tiles:
+                decode_into(*tile)
+
+    def _get_virtual_pixels(self, ubulk_file: Buffer, threads: int = 1, mip: int = 0,
+                            tile_cache: BoundTileCache | None = None) -> np.ndarray:
+        mip_size_x, mip_size_y = self.virtual_mip_size(mip)
+        full_texture = np.zeros((mip_size_y, mip_size_x, self.virtual_channel_count()), np.uint8)
+        self._decode_virtual_tiles_into(full_texture, self._read_virtual_tiles(ubulk_file, mip=mip,
+                                                                               tile_cache=tile_cache),
+                                        threads=threads, tile_cache=tile_cache)
+        return full_texture
+
+    def _get_virtual_data(self, ubulk_file: Buffer, threads: int = 1, mip: int = 0,
+                          tile_cache: BoundTileCache | None = None):
+        Image = pil_image()
+
+        return Image.fromarray(self._get_virtual_pixels(ubulk_file, threads, mip, tile_cache))
+
+    def get_region_pixels(self, ubulk_file: Buffer, x: int, y: int, width: int, height: int, mip: int = 0,
+                          threads: int = 1, tile_cache: BoundTileCache | None = None) -> np.ndarray:
+        if not self.is_virtual:
+            raise ValueError("Region decoding is only supported for virtual textures")
+        mip_size_x, mip_size_y = self.virtual_mip_size(mip)
+        if x < 0 or y < 0 or width <= 0 or height <= 0 or x + width > mip_size_x or y + height > mip_size_y:
+            raise ValueError(f"Region ({x}, {y}, {width}, {height}) is outside of mip {mip} "
+                             f"({mip_size_x}x{mip_size_y})")
+        tile_size = self.virtual_texture_build_data.tile_size
+        tile_columns = range(x // tile_size, -(-(x + width) // tile_size))
+        tile_rows = range(y // tile_size, -(-(y + height) // tile_size))
+        pixels = np.zeros((len(tile_rows) * tile_size, len(tile_columns) * tile_size, self.virtual_channel_count()),
+                          np.uint8)
+        tiles = self._read_virtual_tiles(ubulk_file, tile_rows, tile_columns, mip, tile_cache)
+        self._decode_virtual_tiles_into(pixels, tiles, tile_columns.start, tile_rows.start, threads, tile_cache)
+        local_x = x - tile_columns.start * tile_size
+        local_y = y - tile_rows.start * tile_size
+        return pixels[local_y:local_y + height, local_x:local_x + width]
+
+    def get_region(self, ubulk_file: Buffer, x: int, y: int, width: int, height: int, mip: int = 0,
+                   threads: int = 1, tile_cache: BoundTileCache | None = None):
+        Image = pil_image()
+
+        return Image.fromarray(np.ascontiguousarray(
+            self.get_region_pixels(ubulk_file, x, y, width, height, mip, threads, tile_cache)))
+
+    def iter_virtual_bands(self, ubulk_file: Buffer, band_rows: int = 1, threads: int = 1, mip: int = 0,
+                           tile_cache: BoundTileCache | None = None):
+        # Decodes virtual texture band_rows tile rows at a time, yields (y, pixels) where pixels is reused between bands
+        tile_size = self.virtual_texture_build_data.tile_size
+        mip_size_x, mip_size_y = self.virtual_mip_size(mip)
+        tiles_y = -(-mip_size_y // tile_size)
+        band = np.zeros((band_rows * tile_size, mip_size_x, self.virtual_channel_count()), np.uint8)
+        for first_tile_row in range(0, tiles_y, band_rows):
+            tile_rows = range(first_tile_row, min(first_tile_row + band_rows, tiles_y))
+            y = first_tile_row * tile_size
+            band_height = min(len(tile_rows) * tile_size, mip_size_y - y)
+            band.fill(0)
+            tiles = self._read_virtual_tiles(ubulk_file, tile_rows, mip=mip, tile_cache=tile_cache)
+            self._decode_virtual_tiles_into(band, tiles, 0, first_tile_row, threads, tile_cache)
+            yield y, band[:band_height]
+
 
 @dataclass
 class UEStripDataFlags:
@@ -346,8 +654,9 @@ class Texture2D:
     textures: list[UETexturePlatformData]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name], import_list: list[UEImportObject], export_size: int):
-        base = UEObject.from_buffer(buffer, name_map, import_list, "Texture2D")
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap, import_list: list[UEImportObject], export_size: int,
+                    properties: Collection[str] | None = None):
+        base = UEObject.from_buffer(buffer, name_map, import_list, "Texture2D", properties)
         flags1 = UEStripDataFlags.from_buffer(buffer)
         flags2 = UEStripDataFlags.from_buffer(buffer)
         cooked = buffer.read_uint32()
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Hashable
+
+import numpy as np
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class DecodedTileCache:
+    # Thread safe LRU of decoded pixel arrays, bounded by total nbytes of stored arrays
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: np.ndarray) -> np.ndarray:
+        # Stored arrays are shared between callers, so they are made compact and read-only
+        value = np.ascontiguousarray(value)
+        if isinstance(value.base, np.ndarray) and value.base.nbytes > value.nbytes:
+            # Don't keep bigger parent array (e.g. tile with borders) alive through a view
+            value = value.copy()
+        value.flags.writeable = False
+        if value.nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.nbytes
+            self._entries[key] = value
+            self._size_bytes += value.nbytes
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.nbytes
+                self._evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._size_bytes,
+                              self.max_bytes)
+
+    def bind(self, package_path: Path, export_name: str, texture_index: int) -> 'BoundTileCache':
+        # Including mtime in the key makes entries of re-cooked packages unreachable, they age out through LRU.
+        # texture_index picks platform data entry of the export, every entry has its own mips and chunks.
+        package_path = Path(package_path)
+        return BoundTileCache(self, (str(package_path), os.stat(package_path).st_mtime_ns, export_name,
+                                     texture_index))
+
+
+class BoundTileCache:
+    # DecodedTileCache view scoped to single platform data entry of a package export,
+    # keys are (chunk, mip, tile id) style tuples
+
+    def __init__(self, cache: DecodedTileCache, prefix: tuple[Any, ...]):
+        self.cache = cache
+        self.prefix = prefix
+
+    def get(self, key: tuple[Any, ...]) -> np.ndarray | None:
+        return self.cache.get(self.prefix + key)
+
+    def put(self, key: tuple[Any, ...], value: np.ndarray) -> np.ndarray:
+        return self.cache.put(self.prefix + key, value)
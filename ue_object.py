@@ -1,9 +1,10 @@
 from dataclasses import dataclass
+from typing import Collection
 from uuid import UUID
 
-from asset import Name, UEImportObject, read_name
+from asset import NameMap, UEImportObject, read_name
 from file_utils import Buffer
-from property_tags import UEPropertyTag, TAG_DATA, UEPropertyTagData, TAGS
+from property_tags import UEPropertyTag, TAG_DATA, UEPropertyTagData
 
 
 @dataclass
@@ -12,20 +13,30 @@ class UEObject(dict[str, UEPropertyTag]):
     guid: UUID | None
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, name_map: list[Name], import_list: list[UEImportObject], exported_type: str):
+    def from_buffer(cls, buffer: Buffer, name_map: NameMap, import_list: list[UEImportObject], exported_type: str,
+                    properties: Collection[str] | None = None):
+        # When properties is None every tag is kept and decoded. Otherwise only tags named in properties are kept,
+        # their values are decoded by UEPropertyTag.decode(), and other tags are skipped by their size.
         items = {}
-        while True:
-            tag = cls.read_prop(buffer, name_map, import_list, True)
-            if tag is None:
-                break
-            items[tag.name] = tag
+        while (tag := cls.read_prop_header(buffer, name_map)) is not None:
+            keep = properties is None or tag.name in properties
+            cls.read_prop_payload(buffer, name_map, tag, keep, properties is None)
+            if keep:
+                items[tag.name] = tag
         guid = UUID(bytes=buffer.read(16)) if buffer.read_uint32() != 0 else None
         self = cls(exported_type, guid)
         self.update(items)
         return self
 
     @classmethod
-    def read_prop(cls, buffer: Buffer, name_map: list[Name], import_list: list[UEImportObject], read_data):
+    def read_prop(cls, buffer: Buffer, name_map: NameMap, import_list: list[UEImportObject], read_data):
+        tag = cls.read_prop_header(buffer, name_map)
+        if tag is not None:
+            cls.read_prop_payload(buffer, name_map, tag, read_data, read_data)
+        return tag
+
+    @staticmethod
+    def read_prop_header(buffer: Buffer, name_map: NameMap) -> UEPropertyTag | None:
         name = read_name(buffer, name_map)
         if name == "None":
             return None
@@ -39,13 +50,15 @@ class UEObject(dict[str, UEPropertyTag]):
             tag_data = tag_data_type.from_buffer(buffer, name_map)
         has_prop_guid = buffer.read_uint8() != 0
         guid: UUID | None = UUID(bytes=buffer.read(16)) if has_prop_guid else None
+        return UEPropertyTag(name, prop_type, tag_data, size, array_index, guid)
+
+    @staticmethod
+    def read_prop_payload(buffer: Buffer, name_map: NameMap, tag: UEPropertyTag, keep: bool, decode: bool):
+        # Buffer has to be positioned right after the tag header, it's left after the payload
         start = buffer.tell()
-        tag_type = TAGS.get(prop_type, None)
-        tag: UEPropertyTag | None = None
-        if read_data:
-            if tag_type is None:
-                raise NotImplementedError(prop_type)
-            tag = tag_type.from_buffer_and_tag_data(buffer, name_map, tag_data)
-
-        buffer.seek(start + size)
-        return UEPropertyTag(name, prop_type, tag_data, size, array_index, guid, tag)
+        if keep:
+            tag.payload = buffer.read_view(tag.size)
+            tag.name_map = name_map
+            if decode:
+                tag.decode()
+        buffer.seek(start + tag.size)
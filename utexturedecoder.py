@@ -0,0 +1,311 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+
+@contextlib.contextmanager
+def worker_pool(jobs: int):
+    if jobs <= 1:
+        yield None
+        return
+    # Imported here, process pool machinery alone doubles startup of the header only commands
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield executor
+
+
+def iter_packages(paths: list[Path]):
+    # Same as package_files.iter_assets for directories, without importing decoders
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob("*.uasset"))
+        else:
+            yield path.with_suffix(".uasset")
+
+
+def ls(args: argparse.Namespace) -> int:
+    from asset import UEAsset, get_export_type
+    from file_utils import MappedFileBuffer
+
+    failed = False
+    for asset_path in iter_packages(args.paths):
+        try:
+            with MappedFileBuffer(asset_path) as asset_file:
+                asset = UEAsset.from_buffer(asset_file, lazy=True)
+            exports = [(export_index, get_export_type(exported), exported)
+                       for export_index, exported in enumerate(asset.exported_objects)]
+        except Exception as ex:
+            failed = True
+            print(f"Failed to read {asset_path}: {type(ex).__name__}: {ex}", file=sys.stderr)
+            continue
+        print(f"{asset_path.as_posix()}:")
+        for export_index, class_name, exported in exports:
+            if args.class_name is not None and class_name != args.class_name:
+                continue
+            print(f"  {export_index:4} {class_name:24} {exported.object_name:32} "
+                  f"size={exported.serial_size} offset={exported.serial_offset}")
+    return 1 if failed else 0
+
+
+def probe(args: argparse.Namespace) -> int:
+    from probe import probe as probe_package
+
+    failed = False
+    for asset_path in iter_packages(args.paths):
+        try:
+            textures = probe_package(asset_path)
+        except Exception as ex:
+            failed = True
+            print(f"Failed to probe {asset_path}: {type(ex).__name__}: {ex}", file=sys.stderr)
+            continue
+        for texture in textures:
+            if args.json:
+                import dataclasses
+                import json
+
+                print(json.dumps(dict(path=asset_path.as_posix(), **dataclasses.asdict(texture))))
+                continue
+            line = (f"{asset_path.as_posix()}:{texture.export_name}"
+                    f"{'' if texture.texture_index == 0 else f'[{texture.texture_index}]'} "
+                    f"{texture.size_x}x{texture.size_y} {texture.pixel_format} mips={texture.mip_count}")
+            if texture.slice_count > 1:
+                line += f" slices={texture.slice_count}"
+            if texture.cubemap:
+                line += " cubemap"
+            if texture.is_virtual:
+                tiles_x, tiles_y = texture.tile_grid[0]
+                line += f" virtual tiles={tiles_x}x{tiles_y} tile={texture.tile_size}+{texture.tile_border_size}"
+                line += f" layers={','.join(texture.layer_pixel_formats)}"
+            print(f"{line} bulk={texture.bulk_size} ubulk={texture.ubulk_size}")
+    return 1 if failed else 0
+
+
+def extract(args: argparse.Namespace) -> int:
+    from extractor import ExtractionOptions, safe_extract_asset
+    from package_files import iter_assets
+
+    src_root: Path = args.src.resolve()
+    dst_root: Path = args.dst.resolve()
+    options = ExtractionOptions(src_root, dst_root, args.tile_threads, args.stream_format, args.band_rows,
+                                args.max_size, args.output_format)
+    asset_paths = list(iter_assets(src_root, args.include, args.exclude))
+    worker = partial(safe_extract_asset, options=options)
+
+    manifest = None
+    skipped_count = 0
+    if args.incremental or args.manifest is not None:
+        from manifest import MANIFEST_NAME, ExtractionManifest
+
+        manifest_path = args.manifest.resolve() if args.manifest is not None else dst_root / MANIFEST_NAME
+        manifest = ExtractionManifest(manifest_path, dst_root,
+                                      {"stream_format": args.stream_format, "max_size": args.max_size,
+                                       "output_format": args.output_format}, args.hash)
+        pending = [asset_path for asset_path in asset_paths
+                   if not manifest.is_up_to_date(asset_path.relative_to(src_root).as_posix(), asset_path)]
+        skipped_count = len(asset_paths) - len(pending)
+        asset_paths = pending
+
+    start = time.perf_counter()
+    asset_count = failed_count = output_count = 0
+    total_bytes = total_pixels = 0
+    with worker_pool(args.jobs) as executor:
+        results = executor.map(worker, asset_paths, chunksize=16) if executor else map(worker, asset_paths)
+        for result in results:
+            asset_count += 1
+            total_bytes += result.bytes_read
+            total_pixels += result.pixels
+            output_count += len(result.outputs)
+            if result.error is not None:
+                failed_count += 1
+                print(f"Failed to extract {result.asset_path}:\n{result.error}", file=sys.stderr)
+                continue
+            if manifest is not None:
+                manifest.record(result.asset_path.relative_to(src_root).as_posix(), result.asset_path,
+                                result.export_outputs)
+                if asset_count % 1000 == 0:
+                    manifest.save()
+            if args.verbose:
+                for output in result.outputs:
+                    print("Saved", output.as_posix())
+    if manifest is not None:
+        # Filtered runs only see part of the tree, packages outside of it are not treated as removed
+        if not args.include and not args.exclude:
+            removed_count = manifest.prune(src_root)
+            if removed_count:
+                print(f"Removed outputs of {removed_count} deleted assets")
+        manifest.save()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    print(f"Processed {asset_count} assets ({failed_count} failed, {skipped_count} up to date), "
+          f"wrote {output_count} files in {elapsed:.2f}s")
+    print(f"{asset_count / elapsed:.2f} assets/s, "
+          f"{total_bytes / elapsed / (1024 * 1024):.2f} MB/s, "
+          f"{total_pixels / elapsed / 1e6:.2f} Mpixels/s")
+    return 1 if failed_count else 0
+
+
+def index(args: argparse.Namespace) -> int:
+    from catalog import Catalog, scan_package
+    from package_files import iter_assets
+
+    src_root: Path = args.src.resolve()
+    asset_paths = list(iter_assets(src_root, args.include, args.exclude))
+    start = time.perf_counter()
+    with Catalog(args.db) as catalog:
+        root = catalog.get_meta("root")
+        if root is not None and Path(root) != src_root:
+            print(f"Catalog {args.db} indexes {root}, not {src_root}", file=sys.stderr)
+            return 1
+        catalog.set_meta("root", str(src_root))
+        pending, unchanged_count = catalog.pending_packages(src_root, asset_paths)
+        indexed_count = failed_count = 0
+        with worker_pool(args.jobs) as executor:
+            worker = partial(scan_package, root=src_root)
+            records = executor.map(worker, pending, chunksize=64) if executor else map(worker, pending)
+            for record in records:
+                catalog.store(record)
+                indexed_count += 1
+                if indexed_count % 1000 == 0:
+                    catalog.commit()
+                if record.error is not None:
+                    failed_count += 1
+                    if args.verbose:
+                        print(f"Failed to index {record.path}:\n{record.error}", file=sys.stderr)
+        catalog.commit()
+        removed_count = catalog.prune((asset_path.relative_to(src_root).as_posix() for asset_path in asset_paths),
+                                      args.include, args.exclude)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"Indexed {indexed_count} packages ({failed_count} failed), {unchanged_count} unchanged, "
+          f"{removed_count} removed in {elapsed:.2f}s")
+    return 1 if failed_count else 0
+
+
+def query(args: argparse.Namespace) -> int:
+    from catalog import Catalog
+
+    with Catalog(args.db) as catalog:
+        if args.sql is not None:
+            for row in catalog.execute(args.sql):
+                print("\t".join(str(value) for value in row))
+        elif args.classes:
+            for class_name, count in catalog.count_exports_by_class().items():
+                print(f"{count:8} {class_name}")
+        elif args.failed:
+            for path, error in catalog.failed_packages():
+                print(f"{path}: {error.strip().splitlines()[-1]}")
+        else:
+            for texture in catalog.find_textures(args.pixel_format, args.min_size, args.max_size, args.virtual,
+                                                 args.path):
+                line = (f"{texture.path}:{texture.export_name}"
+                        f"{'' if texture.texture_index == 0 else f'[{texture.texture_index}]'} "
+                        f"{texture.size_x}x{texture.size_y} {texture.pixel_format} mips={texture.mip_count}")
+                if texture.is_virtual:
+                    line += f" virtual layers={','.join(texture.layer_pixel_formats)}"
+                print(f"{line} bulk={texture.bulk_size}")
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    from preview_server import PreviewServer
+
+    PreviewServer(args.root, args.host, args.port, args.workers, args.cache_mb * 1024 * 1024).run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="utexturedecoder")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = subparsers.add_parser("extract", help="Decode all textures from SRC tree into DST")
+    extract_parser.add_argument("src", type=Path)
+    extract_parser.add_argument("dst", type=Path)
+    extract_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                                help="Number of worker processes (default: CPU count)")
+    extract_parser.add_argument("--tile-threads", type=int, default=1,
+                                help="Number of threads decoding virtual texture tiles of a single texture")
+    extract_parser.add_argument("--output-format", choices=["png", "dds"], default="png",
+                                help="dds copies block compressed mips of regular textures without decoding them")
+    extract_parser.add_argument("--stream-format", choices=["tiff", "raw", "tiles"], default=None,
+                                help="Write virtual textures band by band as striped TIFF, raw planar pixels or "
+                                     "per-tile PNGs instead of decoding them whole. raw is headerless uint8 with one "
+                                     "plane per channel in R, G, B(, A) order, rows top to bottom")
+    extract_parser.add_argument("--band-rows", type=int, default=1,
+                                help="Tile rows decoded at once when streaming, bounds peak memory")
+    extract_parser.add_argument("--max-size", type=int, default=None, metavar="PIXELS",
+                                help="Decode the smallest mip whose largest side is at least PIXELS")
+    extract_parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                                help="Only process assets whose path relative to SRC matches GLOB")
+    extract_parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                                help="Skip assets whose path relative to SRC matches GLOB")
+    extract_parser.add_argument("--incremental", action="store_true",
+                                help="Only extract new or changed assets, "
+                                     "tracked in DST/.utexturedecoder-manifest.json")
+    extract_parser.add_argument("--manifest", type=Path, default=None,
+                                help="Manifest file used for incremental extraction, implies --incremental")
+    extract_parser.add_argument("--hash", action="store_true",
+                                help="Compare content hashes when size or mtime changed, so touched files are skipped")
+    extract_parser.add_argument("-v", "--verbose", action="store_true")
+    extract_parser.set_defaults(func=extract)
+
+    ls_parser = subparsers.add_parser("ls", help="List exports of packages, reads only package headers")
+    ls_parser.add_argument("paths", type=Path, nargs="+", metavar="PATH", help="Package or directory of packages")
+    ls_parser.add_argument("--class", dest="class_name", default=None, help="Only list exports of this class")
+    ls_parser.set_defaults(func=ls)
+
+    probe_parser = subparsers.add_parser("probe", help="Print texture size, format, mips and virtual texture layout "
+                                                       "without reading pixel data")
+    probe_parser.add_argument("paths", type=Path, nargs="+", metavar="PATH", help="Package or directory of packages")
+    probe_parser.add_argument("--json", action="store_true", help="Print one JSON object per texture")
+    probe_parser.set_defaults(func=probe)
+
+    index_parser = subparsers.add_parser("index", help="Record packages, exports and texture metadata of SRC in "
+                                                       "SQLite catalog DB, only changed packages are parsed again")
+    index_parser.add_argument("src", type=Path)
+    index_parser.add_argument("db", type=Path)
+    index_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                              help="Number of worker processes (default: CPU count)")
+    index_parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                              help="Only index assets whose path relative to SRC matches GLOB")
+    index_parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                              help="Skip assets whose path relative to SRC matches GLOB")
+    index_parser.add_argument("-v", "--verbose", action="store_true")
+    index_parser.set_defaults(func=index)
+
+    query_parser = subparsers.add_parser("query", help="List textures recorded in catalog DB")
+    query_parser.add_argument("db", type=Path)
+    query_parser.add_argument("--pixel-format", default=None, help="e.g. PF_BC5")
+    query_parser.add_argument("--min-size", type=int, default=None, metavar="PIXELS",
+                              help="Only textures whose largest side is at least PIXELS")
+    query_parser.add_argument("--max-size", type=int, default=None, metavar="PIXELS",
+                              help="Only textures whose largest side is at most PIXELS")
+    query_parser.add_argument("--virtual", action=argparse.BooleanOptionalAction, default=None,
+                              help="Only virtual (--virtual) or only regular (--no-virtual) textures")
+    query_parser.add_argument("--path", default=None, metavar="GLOB", help="Only packages whose path matches GLOB")
+    query_parser.add_argument("--classes", action="store_true", help="Count exports per class instead")
+    query_parser.add_argument("--failed", action="store_true", help="List packages that failed to parse instead")
+    query_parser.add_argument("--sql", default=None, help="Run raw SQL against the catalog instead")
+    query_parser.set_defaults(func=query)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve decoded mips and virtual texture tiles over local HTTP")
+    serve_parser.add_argument("root", type=Path)
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Loopback address to listen on")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                              help="Threads decoding textures in background")
+    serve_parser.add_argument("--cache-mb", type=int, default=512, help="Decoded tile cache budget in MiB")
+    serve_parser.set_defaults(func=serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())